@@ -0,0 +1,79 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+from api.cache import get_version
+from api.constants import INGREDIENTS_VERSION_KEY
+from recipes.models import Ingredient
+
+# Символ больше любого символа названия для поиска границы префикса
+MAX_CHAR = "\U0010ffff"
+
+_index = None
+_lock = threading.Lock()
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов для автодополнения в памяти процесса.
+
+    Названия в нижнем регистре хранятся в отсортированном массиве,
+    совпадения с начала названия находим бинарным поиском,
+    остальные совпадения - просмотром каталога.
+    """
+
+    def __init__(self, ingredients, version=None):
+        self.version = version
+        self.ingredients = sorted(
+            ingredients, key=lambda ingredient: ingredient["name"]
+        )
+        self.names = [
+            ingredient["name"].lower() for ingredient in self.ingredients
+        ]
+        self.entries = sorted(
+            (key, position) for position, key in enumerate(self.names)
+        )
+        self.keys = [key for key, _ in self.entries]
+
+    def search(self, name, limit=None):
+        """
+        Ищем ингредиенты по части названия без учета регистра.
+
+        Порядок совпадает с поиском в базе данных: сначала ингредиенты,
+        название которых начинается с искомой строки, затем остальные,
+        внутри каждой группы - по названию.
+        """
+        name = name.lower()
+        start = bisect_left(self.keys, name)
+        end = bisect_right(self.keys, name + MAX_CHAR, lo=start)
+        positions = sorted(
+            position for _, position in self.entries[start:end]
+        )
+        result = [self.ingredients[position] for position in positions]
+        if limit is not None and len(result) >= limit:
+            return result[:limit]
+        for key, ingredient in zip(self.names, self.ingredients):
+            if limit is not None and len(result) == limit:
+                break
+            if name in key and not key.startswith(name):
+                result.append(ingredient)
+        return result
+
+
+def get_ingredient_index():
+    """
+    Получаем индекс ингредиентов.
+
+    Индекс перестраивается при изменении версии каталога ингредиентов.
+    """
+    global _index
+    version = get_version(INGREDIENTS_VERSION_KEY)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = IngredientIndex(
+                Ingredient.objects.values("id", "name", "measurement_unit"),
+                version,
+            )
+        return _index
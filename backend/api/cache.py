@@ -0,0 +1,140 @@
+import gzip
+import time
+from functools import partial
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from api.constants import (
+    BROTLI,
+    CATALOG_CACHE_KEY,
+    GZIP,
+    RECIPE_CACHE_KEY,
+    RECIPE_CACHE_VERSION,
+    RECIPE_VERSION_KEY,
+)
+
+# Способы сжатия справочников
+CATALOG_COMPRESSORS = {BROTLI: brotli.compress, GZIP: gzip.compress}
+
+
+def get_recipe_cache_key(recipe_id, version):
+    """Получаем ключ кэша представления рецепта для его версии."""
+    return RECIPE_CACHE_KEY.format(recipe_id, version)
+
+
+def get_cached_recipes(recipes, serialize):
+    """
+    Получаем общие для всех пользователей представления рецептов.
+
+    Ключ содержит версию рецепта, поэтому представление, построенное
+    до изменения рецепта и сохраненное после сброса версии,
+    недостижимо. Отсутствующие в кэше представления строим функцией
+    serialize и сохраняем в кэш.
+    """
+    versions = get_recipe_versions([recipe.pk for recipe in recipes])
+    keys = [
+        get_recipe_cache_key(recipe.pk, versions[recipe.pk])
+        for recipe in recipes
+    ]
+    cached = cache.get_many(keys, version=RECIPE_CACHE_VERSION)
+    missing = [
+        (key, recipe)
+        for key, recipe in zip(keys, recipes)
+        if key not in cached
+    ]
+    if missing:
+        fresh = dict(
+            zip(
+                (key for key, _ in missing),
+                serialize([recipe for _, recipe in missing]),
+            )
+        )
+        cache.set_many(
+            fresh,
+            timeout=settings.RECIPE_CACHE_TIMEOUT,
+            version=RECIPE_CACHE_VERSION,
+        )
+        cached.update(fresh)
+    return [cached[key] for key in keys]
+
+
+def get_version(key):
+    """
+    Получаем версию данных - время их последнего изменения.
+
+    Если версии нет в кэше, считаем, что данные изменились сейчас.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_recipe_version(recipe_id):
+    """Получаем версию рецепта."""
+    return get_version(RECIPE_VERSION_KEY.format(recipe_id))
+
+
+def get_recipe_versions(recipe_ids):
+    """Получаем версии нескольких рецептов: id - версия."""
+    keys = {
+        recipe_id: RECIPE_VERSION_KEY.format(recipe_id)
+        for recipe_id in recipe_ids
+    }
+    cached = cache.get_many(keys.values())
+    return {
+        recipe_id: (
+            cached[key] if key in cached else get_recipe_version(recipe_id)
+        )
+        for recipe_id, key in keys.items()
+    }
+
+
+def delete_on_commit(keys, **kwargs):
+    """
+    Удаляем ключи из кэша.
+
+    Повторяем удаление после коммита транзакции, чтобы убрать
+    значения, закэшированные до того, как изменения стали видны.
+    """
+    delete = partial(cache.delete_many, keys, **kwargs)
+    delete()
+    transaction.on_commit(delete)
+
+
+def invalidate_recipes(recipe_ids):
+    """
+    Сбрасываем версии рецептов.
+
+    Представления старых версий становятся недостижимы
+    и удаляются из кэша по истечении RECIPE_CACHE_TIMEOUT.
+    """
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    delete_on_commit(
+        [RECIPE_VERSION_KEY.format(recipe_id) for recipe_id in recipe_ids]
+    )
+
+
+def get_cached_catalog(version_key, version, render):
+    """
+    Получаем справочник, сжатый всеми доступными способами.
+
+    Справочник строим функцией render один раз для каждой версии
+    и храним в кэше в виде байтов для каждого Content-Encoding.
+    """
+    key = CATALOG_CACHE_KEY.format(version_key, version)
+    catalog = cache.get(key)
+    if catalog is None:
+        content = render()
+        catalog = {
+            encoding: compress(content)
+            for encoding, compress in CATALOG_COMPRESSORS.items()
+        }
+        cache.set(key, catalog, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    return catalog
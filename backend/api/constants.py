@@ -12,6 +12,14 @@ TEXT_X = 100
 TITLE_FONT_SIZE = 16
 # Размер шрифта текста ингредиентов
 TEXT_FONT_SIZE = 12
+# Нижняя граница текста, ниже которой начинается новая страница
+BOTTOM_Y = 50
+# Название шрифта с кириллицей
+PDF_FONT_NAME = "DejaVuSans"
+# Файл шрифта с кириллицей
+PDF_FONT_FILE = "DejaVuSans.ttf"
+# Размер PDF, после которого документ сбрасывается из памяти на диск
+PDF_SPOOL_SIZE = 1024 * 1024
 # Истинно
 TRUE = "1"
 # Ложно
@@ -20,3 +28,73 @@ FALSE = "0"
 MIN_AMOUNT = 1
 # Максимальное количество
 MAX_AMOUNT = 32000
+# Параметр режима фильтрации по тэгам
+TAGS_MATCH_PARAM = "tags_match"
+# Рецепт должен иметь все указанные тэги
+ALL_TAGS = "all"
+# Шаблон ключа кэша представления рецепта: id и версия рецепта
+RECIPE_CACHE_KEY = "recipe:{}:{}"
+# Версия формата кэшированного представления рецепта
+RECIPE_CACHE_VERSION = 1
+# Шаблон ключа версии рецепта
+RECIPE_VERSION_KEY = "recipe-version:{}"
+# Ключ версии списка тэгов
+TAGS_VERSION_KEY = "tags-version"
+# Ключ версии списка ингредиентов
+INGREDIENTS_VERSION_KEY = "ingredients-version"
+# Параметр списка полей рецепта
+FIELDS_PARAM = "fields"
+# Параметр списка исключаемых полей рецепта
+OMIT_PARAM = "omit"
+# Колонки рецепта, которые не загружаются без соответствующего поля
+SPARSE_COLUMNS = {
+    "author": "author",
+    "name": "name",
+    "image": "image",
+    "text": "text",
+    "cooking_time": "cooking_time",
+}
+# Параметр списка id рецептов
+BATCH_IDS_PARAM = "ids"
+# Максимальное количество рецептов в одном запросе
+MAX_BATCH_IDS = 100
+# Параметр полнотекстового поиска рецептов
+SEARCH_PARAM = "search"
+# Параметр ограничения количества ингредиентов в ответе
+INGREDIENTS_LIMIT_PARAM = "limit"
+# Максимальное количество ингредиентов в ответе на поиск по названию
+MAX_INGREDIENTS_LIMIT = 50
+# Ключ кэша сжатого справочника: ключ версии справочника и версия
+CATALOG_CACHE_KEY = "catalog:{}:{}"
+# Способы сжатия справочников
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+# Способы сжатия в порядке предпочтения
+CATALOG_ENCODINGS = (BROTLI, GZIP)
+# Форматы выгрузки списка покупок
+PDF = "pdf"
+TXT = "txt"
+CSV = "csv"
+JSON = "json"
+# Поля ингредиента в выгрузке списка покупок
+EXPORT_FIELDS = ("name", "measurement_unit", "amount")
+# Имя файла выгрузки списка покупок без расширения
+EXPORT_FILENAME = "shoppinglist"
+# Количество строк списка покупок, читаемых из курсора за раз
+EXPORT_CHUNK_SIZE = 2000
+# Версия оформления документов списка покупок.
+# Увеличивается при изменении шрифта или верстки документа.
+DOCUMENT_VERSION = 1
+# Статусы фонового задания построения документа
+JOB_PENDING = "pending"
+JOB_FAILED = "failed"
+JOB_READY = "ready"
+# Расширение файла блокировки фонового задания в кэше документов
+JOB_LOCK = "lock"
+# Результаты массового добавления и удаления рецептов
+BULK_ADDED = "added"
+BULK_EXISTS = "exists"
+BULK_REMOVED = "removed"
+BULK_MISSING = "missing"
+BULK_NOT_FOUND = "not_found"
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+
+from api.constants import DOCUMENT_VERSION, JOB_LOCK, PDF_FONT_FILE
+
+
+def get_document_key(ingredients, export_format):
+    """
+    Получаем ключ документа списка покупок.
+
+    Ключ - хэш содержимого списка, формата и версии оформления,
+    поэтому одинаковые списки дают один и тот же документ.
+    """
+    content = json.dumps(
+        [DOCUMENT_VERSION, PDF_FONT_FILE, export_format, ingredients],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_document_path(key, export_format):
+    """Получаем путь к документу в кэше."""
+    return os.path.join(
+        settings.DOCUMENT_CACHE_DIR, f"{key}.{export_format}"
+    )
+
+
+def open_document(key, export_format):
+    """
+    Открываем документ из кэша.
+
+    Устаревший или отсутствующий документ возвращаем как None.
+    Время изменения файла обновляем, чтобы вытеснять
+    давно не использованные документы.
+    """
+    path = get_document_path(key, export_format)
+    try:
+        document = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    now = time.time()
+    if now - os.fstat(document.fileno()).st_mtime > (
+        settings.DOCUMENT_CACHE_MAX_AGE
+    ):
+        document.close()
+        return None
+    os.utime(path, (now, now))
+    return document
+
+
+def store_document(key, export_format, document):
+    """
+    Сохраняем документ в кэш и открываем сохраненный файл.
+
+    Файл записываем во временный и атомарно переименовываем,
+    чтобы параллельные запросы не читали недописанный документ.
+    """
+    os.makedirs(settings.DOCUMENT_CACHE_DIR, exist_ok=True)
+    path = get_document_path(key, export_format)
+    with tempfile.NamedTemporaryFile(
+        dir=settings.DOCUMENT_CACHE_DIR, delete=False
+    ) as temporary:
+        shutil.copyfileobj(document, temporary)
+    os.replace(temporary.name, path)
+    saved = open(path, "rb")
+    evict_documents()
+    return saved
+
+
+def evict_documents():
+    """
+    Удаляем документы старше DOCUMENT_CACHE_MAX_AGE, затем давно
+    не использованные, пока кэш не станет меньше DOCUMENT_CACHE_MAX_SIZE.
+    """
+    now = time.time()
+    documents = []
+    with os.scandir(settings.DOCUMENT_CACHE_DIR) as entries:
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > settings.DOCUMENT_CACHE_MAX_AGE:
+                remove_document(entry.path)
+            elif not entry.name.endswith(f".{JOB_LOCK}"):
+                # Пустые файлы блокировок заданий удаляем только по возрасту.
+                documents.append((stat.st_mtime, stat.st_size, entry.path))
+    size = sum(document_size for _, document_size, _ in documents)
+    for _, document_size, path in sorted(documents):
+        if size <= settings.DOCUMENT_CACHE_MAX_SIZE:
+            break
+        remove_document(path)
+        size -= document_size
+
+
+def remove_document(path):
+    """Удаляем документ, если его еще не удалил другой процесс."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
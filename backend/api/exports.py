@@ -0,0 +1,56 @@
+import csv
+import json
+
+from api.constants import CSV, EXPORT_FIELDS, JSON, TXT
+from api.pdf import get_shopping_list_line
+
+
+class Echo:
+    """Псевдофайл, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def get_export_row(ingredient):
+    """Получаем значения полей выгрузки для ингредиента."""
+    return (
+        ingredient["name"],
+        ingredient["measurement_unit"],
+        ingredient["total_amount"],
+    )
+
+
+def export_txt(ingredients):
+    """Выгружаем список покупок в текст построчно."""
+    yield "Список покупок\n\n"
+    for ingredient in ingredients:
+        yield f"{get_shopping_list_line(ingredient)}\n"
+
+
+def export_csv(ingredients):
+    """Выгружаем список покупок в CSV построчно."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for ingredient in ingredients:
+        yield writer.writerow(get_export_row(ingredient))
+
+
+def export_json(ingredients):
+    """Выгружаем список покупок в JSON по одному ингредиенту."""
+    separator = "["
+    for ingredient in ingredients:
+        yield separator + json.dumps(
+            dict(zip(EXPORT_FIELDS, get_export_row(ingredient))),
+            ensure_ascii=False,
+        )
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+# Потоковые выгрузки списка покупок по форматам
+EXPORTS = {
+    TXT: export_txt,
+    CSV: export_csv,
+    JSON: export_json,
+}
@@ -0,0 +1,121 @@
+import fcntl
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+
+from api.constants import JOB_FAILED, JOB_LOCK, JOB_PENDING, PDF
+from api.documents import get_document_path, store_document
+from api.pdf import get_shopping_list_pdf
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor(reset=False):
+    """
+    Получаем пул процессов для построения документов.
+
+    Пул создается в каждом процессе backend при первом задании.
+    Процессы пула запускаем через spawn: при fork они унаследовали бы
+    открытые файлы блокировок заданий и удерживали бы их.
+    """
+    global _executor
+    with _lock:
+        if _executor is None or reset:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.DOCUMENT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def render_pdf(ingredients):
+    """Строим pdf-документ в процессе пула и возвращаем его байты."""
+    with get_shopping_list_pdf(ingredients) as document:
+        return document.read()
+
+
+def lock_job(key):
+    """
+    Захватываем файловую блокировку задания.
+
+    Блокировку держит процесс backend, запустивший задание,
+    и операционная система снимает ее, если процесс завершился.
+    Если блокировку держит другой процесс, возвращаем None.
+    """
+    os.makedirs(settings.DOCUMENT_CACHE_DIR, exist_ok=True)
+    lock = open(get_document_path(key, JOB_LOCK), "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+
+def is_job_running(key):
+    """Проверяем, держит ли какой-либо процесс блокировку задания."""
+    try:
+        lock = open(get_document_path(key, JOB_LOCK))
+    except FileNotFoundError:
+        return False
+    with lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+    return False
+
+
+def get_job_status(key):
+    """
+    Получаем статус задания по файлу блокировки в кэше документов.
+
+    Статус не храним в кэше Django: вытеснение записи кэша
+    не должно терять выполняющееся задание. Файла блокировки нет -
+    задание неизвестно. Блокировку держит процесс - задание
+    выполняется. Иначе документ не был сохранен: задание завершилось
+    ошибкой или процесс backend перезапустился, не завершив его.
+    """
+    if not os.path.exists(get_document_path(key, JOB_LOCK)):
+        return None
+    return JOB_PENDING if is_job_running(key) else JOB_FAILED
+
+
+def start_render_job(key, ingredients):
+    """
+    Запускаем построение pdf-документа в пуле процессов.
+
+    Повторные запросы того же документа, пока задание выполняется,
+    нового задания не создают. Завершившееся ошибкой или прерванное
+    задание запускаем заново.
+    """
+    lock = lock_job(key)
+    if lock is None:
+        return
+    try:
+        future = get_executor().submit(render_pdf, ingredients)
+    except BrokenProcessPool:
+        future = get_executor(reset=True).submit(render_pdf, ingredients)
+    future.add_done_callback(partial(finish_render_job, key, lock))
+
+
+def finish_render_job(key, lock, future):
+    """
+    Сохраняем построенный документ в кэш документов.
+
+    Функция выполняется в основном процессе, поэтому использует
+    его настройки кэша документов. Блокировку снимаем после
+    сохранения документа.
+    """
+    try:
+        if future.exception() is None:
+            store_document(key, PDF, io.BytesIO(future.result())).close()
+    finally:
+        lock.close()
@@ -0,0 +1,139 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
+from users.models import User
+
+# Размер пачки для bulk_create
+BATCH_SIZE = 5000
+# Размер страницы, как в настройках пагинации
+PAGE_SIZE = 6
+# Зерно генератора случайных чисел для воспроизводимых данных
+SEED = 42
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Базовая команда для замеров производительности.
+
+    Тестовые данные создаются в транзакции,
+    которая откатывается после замеров.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Количество повторов каждого замера.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(SEED)
+        with transaction.atomic():
+            self.seed(**options)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            self.benchmark(**options)
+            transaction.set_rollback(True)
+
+    def seed(self, **options):
+        """Создаем тестовые данные."""
+
+    def benchmark(self, **options):
+        """Выполняем замеры."""
+        raise NotImplementedError
+
+    def measure(self, label, func, repeat):
+        """Замеряем время выполнения функции и выводим результат."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        self.stdout.write(
+            f"{label}: min {min(timings) * 1000:.2f} мс, "
+            f"медиана {statistics.median(timings) * 1000:.2f} мс"
+        )
+        return min(timings)
+
+    def fetch_page(self, queryset):
+        """Повторяем запросы пагинатора: количество и первая страница."""
+        queryset.count()
+        list(queryset[:PAGE_SIZE])
+
+    def create_author(self, name="benchmark"):
+        """Создаем автора тестовых рецептов."""
+        return User.objects.create(
+            username=name, email=f"{name}@benchmark.local"
+        )
+
+    def create_tags(self, count):
+        """Создаем тэги."""
+        return Tag.objects.bulk_create(
+            Tag(name=f"benchmark-tag-{number}", slug=f"benchmark-{number}")
+            for number in range(count)
+        )
+
+    def create_ingredients(self, count):
+        """Создаем ингредиенты."""
+        return Ingredient.objects.bulk_create(
+            (
+                Ingredient(
+                    name=f"benchmark-ingredient-{number}",
+                    measurement_unit="г",
+                )
+                for number in range(count)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+    def create_recipes(
+        self,
+        count,
+        author,
+        tags=(),
+        tags_per_recipe=0,
+        ingredients=(),
+        ingredients_per_recipe=0,
+    ):
+        """Создаем рецепты со случайными тэгами и ингредиентами."""
+        recipes = Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author=author,
+                    name=f"benchmark-recipe-{number}",
+                    text="benchmark",
+                    cooking_time=1,
+                )
+                for number in range(count)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        RecipeTag.objects.bulk_create(
+            (
+                RecipeTag(recipe=recipe, tags=tag)
+                for recipe in recipes
+                for tag in self.random.sample(tags, tags_per_recipe)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        RecipeIngredient.objects.bulk_create(
+            (
+                RecipeIngredient(
+                    recipe=recipe,
+                    ingredient=ingredient,
+                    amount=self.random.randint(1, 1000),
+                )
+                for recipe in recipes
+                for ingredient in self.random.sample(
+                    ingredients, ingredients_per_recipe
+                )
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        return recipes
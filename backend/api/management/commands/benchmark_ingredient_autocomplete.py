@@ -0,0 +1,56 @@
+from api.autocomplete import IngredientIndex
+from api.constants import MAX_INGREDIENTS_LIMIT
+from api.management.benchmark import BenchmarkCommand
+from api.views import search_ingredients
+from recipes.models import Ingredient
+
+# Поисковые строки: совпадение с начала названия и с середины
+SEARCH_TERMS = (
+    ("Префикс", "benchmark-ingredient-12"),
+    ("Подстрока", "ent-12"),
+)
+
+
+class Command(BenchmarkCommand):
+    """Сравниваем автодополнение ингредиентов из памяти и из базы данных."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--ingredients",
+            type=int,
+            default=2_000,
+            help="Количество тестовых ингредиентов.",
+        )
+
+    def seed(self, **options):
+        self.create_ingredients(options["ingredients"])
+
+    def benchmark(self, **options):
+        self.measure(
+            "Построение индекса",
+            self.build_index,
+            options["repeat"],
+        )
+        index = self.build_index()
+        for label, term in SEARCH_TERMS:
+            self.measure(
+                f"{label}, база данных",
+                lambda term=term: list(
+                    search_ingredients(Ingredient.objects.all(), term).values(
+                        "id", "name", "measurement_unit"
+                    )[:MAX_INGREDIENTS_LIMIT]
+                ),
+                options["repeat"],
+            )
+            self.measure(
+                f"{label}, индекс в памяти",
+                lambda term=term: index.search(term, MAX_INGREDIENTS_LIMIT),
+                options["repeat"],
+            )
+
+    def build_index(self):
+        """Строим индекс по всему каталогу ингредиентов."""
+        return IngredientIndex(
+            Ingredient.objects.values("id", "name", "measurement_unit")
+        )
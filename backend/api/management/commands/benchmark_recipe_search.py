@@ -0,0 +1,91 @@
+from django.db import connection
+
+from api.management.benchmark import BATCH_SIZE, PAGE_SIZE, BenchmarkCommand
+from api.views import search_recipes
+from recipes.models import Recipe
+
+# Слоги для генерации слов
+SYLLABLES = (
+    "ба", "ве", "ги", "до", "жу", "за", "ки", "ло", "му", "не",
+    "по", "ру", "си", "та", "фу", "ха", "це", "чи", "ша", "щу",
+)
+# Количество слов в словаре
+VOCABULARY_SIZE = 5000
+# Количество слов в названии и описании рецепта
+NAME_WORDS = 3
+TEXT_WORDS = 30
+# Редкое слово и количество рецептов с ним
+RARE_WORD = "рататуй"
+RARE_WORD_RECIPES = 10
+# Индекс, который должен использовать поиск
+SEARCH_INDEX = "recipe_search_vector_idx"
+
+
+class Command(BenchmarkCommand):
+    """Замеряем полнотекстовый поиск рецептов."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=1_000_000,
+            help="Количество тестовых рецептов.",
+        )
+
+    def seed(self, **options):
+        vocabulary = list(
+            {
+                "".join(self.random.choices(SYLLABLES, k=3))
+                for _ in range(VOCABULARY_SIZE)
+            }
+        )
+        self.common_word = vocabulary[0]
+        author = self.create_author()
+        batch = []
+        for number in range(options["recipes"]):
+            text = " ".join(self.random.choices(vocabulary, k=TEXT_WORDS))
+            if number < RARE_WORD_RECIPES:
+                text = f"{text} {RARE_WORD}"
+            batch.append(
+                Recipe(
+                    author=author,
+                    name=" ".join(
+                        self.random.choices(vocabulary, k=NAME_WORDS)
+                    ),
+                    text=text,
+                    cooking_time=1,
+                )
+            )
+            if len(batch) == BATCH_SIZE:
+                Recipe.objects.bulk_create(batch)
+                batch = []
+        Recipe.objects.bulk_create(batch)
+
+    def benchmark(self, **options):
+        for label, term in (
+            ("Редкое слово", RARE_WORD),
+            ("Частое слово", self.common_word),
+        ):
+            queryset = search_recipes(Recipe.objects.all(), term)
+            plan = queryset[:PAGE_SIZE].explain()
+            self.stdout.write(f"{label} ({term}):\n{plan}")
+            if SEARCH_INDEX not in plan:
+                self.stderr.write(f"Запрос не использует {SEARCH_INDEX}.")
+            self.measure(
+                f"{label}: количество и первая страница",
+                lambda queryset=queryset: self.fetch_page(queryset),
+                options["repeat"],
+            )
+        self.stdout.write(
+            f"Размер индекса: {self.get_index_size(SEARCH_INDEX)}"
+        )
+
+    def get_index_size(self, name):
+        """Получаем размер индекса."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_size_pretty(pg_relation_size(%s::regclass))",
+                [name],
+            )
+            return cursor.fetchone()[0]
@@ -0,0 +1,108 @@
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import F, Sum
+from django.test.utils import CaptureQueriesContext
+
+from api.management.benchmark import BATCH_SIZE, BenchmarkCommand
+from api.views import get_aggregatted_ingredients
+from recipes.models import (
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+)
+
+# Количество ингредиентов в каталоге
+INGREDIENTS_COUNT = 2000
+# Количество ингредиентов в рецепте
+INGREDIENTS_PER_RECIPE = 10
+
+
+class Command(BenchmarkCommand):
+    """
+    Сравниваем суммирование списка покупок в Python, группировку
+    в базе данных и чтение суммарного списка покупок.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=500,
+            help="Количество рецептов в списке покупок.",
+        )
+
+    def seed(self, **options):
+        self.user = self.create_author()
+        recipes = self.create_recipes(
+            options["recipes"],
+            self.user,
+            ingredients=self.create_ingredients(INGREDIENTS_COUNT),
+            ingredients_per_recipe=INGREDIENTS_PER_RECIPE,
+        )
+        ShoppingCart.objects.bulk_create(
+            (
+                ShoppingCart(user=self.user, recipe=recipe)
+                for recipe in recipes
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        # bulk_create не обновляет суммарный список покупок.
+        ShoppingListItem.objects.add_user_recipes(
+            self.user, [recipe.pk for recipe in recipes]
+        )
+
+    def benchmark(self, **options):
+        if self.aggregate_in_database() != list(
+            get_aggregatted_ingredients(self.user)
+        ):
+            self.stderr.write("Суммарный список покупок не совпадает.")
+        for label, func in (
+            ("Суммирование в Python", self.aggregate_in_python),
+            ("Группировка в базе данных", self.aggregate_in_database),
+            (
+                "Суммарный список покупок",
+                lambda: list(get_aggregatted_ingredients(self.user)),
+            ),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            self.measure(
+                f"{label}, запросов: {len(queries)}", func, options["repeat"]
+            )
+
+    def aggregate_in_database(self):
+        """Суммирование запросом GROUP BY по ингредиентам рецептов."""
+        return list(
+            RecipeIngredient.objects.filter(
+                recipe__is_in_shopping_cart__user=self.user
+            )
+            .values(
+                name=F("ingredient__name"),
+                measurement_unit=F("ingredient__measurement_unit"),
+            )
+            .annotate(total_amount=Sum("amount"))
+            .order_by("name", "measurement_unit")
+        )
+
+    def aggregate_in_python(self):
+        """Прежняя реализация: суммирование в Python по названию."""
+        recipes = Recipe.objects.filter(
+            is_in_shopping_cart__user=self.user
+        ).prefetch_related("recipe_ingredients")
+        ingredients = defaultdict(
+            lambda: {"amount": 0, "measurement_unit": ""}
+        )
+        for recipe in recipes:
+            for recipe_ingredient in recipe.recipe_ingredients.all():
+                ingredient = recipe_ingredient.ingredient
+                ingredients[ingredient.name]["amount"] += (
+                    recipe_ingredient.amount
+                )
+                if not ingredients[ingredient.name]["measurement_unit"]:
+                    ingredients[ingredient.name]["measurement_unit"] = (
+                        ingredient.measurement_unit
+                    )
+        return dict(ingredients)
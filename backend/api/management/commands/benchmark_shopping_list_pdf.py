@@ -0,0 +1,47 @@
+import tracemalloc
+
+from api.management.benchmark import BenchmarkCommand
+from api.pdf import get_shopping_list_pdf
+
+
+class Command(BenchmarkCommand):
+    """Замеряем время и пиковую память построения PDF списка покупок."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--lines",
+            type=int,
+            nargs="+",
+            default=[10, 1_000, 10_000],
+            help="Количество строк в списке покупок.",
+        )
+
+    def benchmark(self, **options):
+        for lines in options["lines"]:
+            self.measure(
+                f"{lines} строк",
+                lambda lines=lines: self.render(lines).close(),
+                options["repeat"],
+            )
+            tracemalloc.start()
+            output = self.render(lines)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            size = output.seek(0, 2)
+            output.close()
+            self.stdout.write(
+                f"{lines} строк: размер PDF {size / 1024:.1f} КБ, "
+                f"пиковая память {peak / 1024:.1f} КБ"
+            )
+
+    def render(self, lines):
+        """Строим PDF из сгенерированных строк списка покупок."""
+        return get_shopping_list_pdf(
+            {
+                "name": f"Ингредиент {number}",
+                "measurement_unit": "г",
+                "total_amount": number,
+            }
+            for number in range(lines)
+        )
@@ -0,0 +1,115 @@
+import string
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.management.benchmark import BATCH_SIZE, BenchmarkCommand
+from recipes.models import Recipe
+
+# Длина и символы старых случайных коротких ссылок
+LEGACY_LINK_LENGTH = 3
+LEGACY_LINK_CHARACTERS = string.ascii_letters + string.digits
+
+
+class Command(BenchmarkCommand):
+    """
+    Сравниваем создание рецептов со случайной короткой ссылкой
+    и со ссылкой, вычисляемой по id.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--existing",
+            type=int,
+            default=100_000,
+            help="Количество рецептов со старыми случайными ссылками.",
+        )
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=1_000,
+            help="Количество рецептов, создаваемых за один замер.",
+        )
+
+    def seed(self, **options):
+        self.author = self.create_author()
+        links = set()
+        while len(links) < options["existing"]:
+            links.add(self.generate_legacy_link())
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author=self.author,
+                    name="benchmark-legacy",
+                    text="benchmark",
+                    cooking_time=1,
+                    short_link=short_link,
+                )
+                for short_link in links
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+    def benchmark(self, **options):
+        count = options["recipes"]
+        for label, func in (
+            (
+                "Случайная ссылка, save",
+                lambda: self.create_one_by_one(count, legacy=True),
+            ),
+            (
+                "Ссылка по id, save",
+                lambda: self.create_one_by_one(count, legacy=False),
+            ),
+            ("Ссылка по id, bulk_create", lambda: self.create_in_bulk(count)),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            self.measure(
+                f"{label}, запросов на {count} рецептов: {len(queries)}",
+                func,
+                options["repeat"],
+            )
+
+    def generate_legacy_link(self):
+        """Случайная ссылка без проверки в базе данных."""
+        return "".join(
+            self.random.choice(LEGACY_LINK_CHARACTERS)
+            for _ in range(LEGACY_LINK_LENGTH)
+        )
+
+    def allocate_legacy_link(self):
+        """
+        Прежняя реализация: случайная ссылка с проверкой
+        существования на каждой попытке.
+        """
+        while True:
+            short_link = self.generate_legacy_link()
+            if not Recipe.objects.filter(short_link=short_link).exists():
+                return short_link
+
+    def build_recipe(self, legacy):
+        """Строим рецепт, при необходимости со старой ссылкой."""
+        return Recipe(
+            author=self.author,
+            name="benchmark-new",
+            text="benchmark",
+            cooking_time=1,
+            short_link=self.allocate_legacy_link() if legacy else None,
+        )
+
+    def create_one_by_one(self, count, legacy):
+        """Создаем рецепты по одному."""
+        for _ in range(count):
+            self.build_recipe(legacy).save()
+
+    def create_in_bulk(self, count):
+        """
+        Создаем рецепты одним bulk_create. Прежде bulk_create
+        оставлял рецепты без короткой ссылки.
+        """
+        Recipe.objects.bulk_create(
+            [self.build_recipe(legacy=False) for _ in range(count)],
+            batch_size=BATCH_SIZE,
+        )
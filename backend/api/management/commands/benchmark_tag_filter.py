@@ -0,0 +1,53 @@
+from api.management.benchmark import BenchmarkCommand
+from api.views import filter_by_tags
+from recipes.models import Recipe
+
+# Количество тэгов в тестовых данных
+TAGS_COUNT = 10
+# Количество тэгов у рецепта
+TAGS_PER_RECIPE = 3
+# Количество тэгов в фильтре
+FILTER_TAGS_COUNT = 2
+
+
+class Command(BenchmarkCommand):
+    """Сравниваем фильтрацию рецептов по тэгам через DISTINCT и EXISTS."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=100_000,
+            help="Количество тестовых рецептов.",
+        )
+
+    def seed(self, **options):
+        tags = self.create_tags(TAGS_COUNT)
+        self.create_recipes(
+            options["recipes"],
+            self.create_author(),
+            tags=tags,
+            tags_per_recipe=TAGS_PER_RECIPE,
+        )
+        self.slugs = [tag.slug for tag in tags[:FILTER_TAGS_COUNT]]
+
+    def benchmark(self, **options):
+        recipes = Recipe.objects.all()
+        variants = (
+            (
+                "JOIN + DISTINCT, любой тэг",
+                recipes.filter(tags__slug__in=self.slugs).distinct(),
+            ),
+            ("EXISTS, любой тэг", filter_by_tags(recipes, self.slugs)),
+            (
+                "EXISTS, все тэги",
+                filter_by_tags(recipes, self.slugs, match_all=True),
+            ),
+        )
+        for label, queryset in variants:
+            self.measure(
+                label,
+                lambda queryset=queryset: self.fetch_page(queryset),
+                options["repeat"],
+            )
@@ -1,9 +1,27 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from rest_framework import serializers, status, viewsets
 from rest_framework.mixins import CreateModelMixin, DestroyModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.cache import CATALOG_COMPRESSORS, get_cached_catalog, get_version
+from api.constants import (
+    BATCH_IDS_PARAM,
+    BULK_ADDED,
+    BULK_EXISTS,
+    BULK_MISSING,
+    BULK_NOT_FOUND,
+    BULK_REMOVED,
+    CATALOG_ENCODINGS,
+    IDENTITY,
+    MAX_BATCH_IDS,
+)
 from recipes.models import Recipe
 from recipes.serializers import RecipeReadShortSerializer
 
@@ -16,58 +34,285 @@ class ShoppingCartFavoriteSerializerMixin(serializers.ModelSerializer):
     class Meta:
         fields = ("recipe",)
 
-    def create_recipe_and_user(self, model_class, validated_data):
-        """Переопределение метода create для корректного сохранения объекта."""
-        user = self.context["request"].user
-        recipe = self.context["view"].kwargs.get("recipe_id")
-        recipe_instance = get_object_or_404(Recipe, id=recipe)
-        return model_class.objects.create(user=user, recipe=recipe_instance)
-
-    def validate_recipe_and_user(self, model_class, error_message):
-        """Валидация подписки на пользователя."""
-        user = self.context["request"].user
-        recipe = self.context["view"].kwargs.get("recipe_id")
-        if model_class.objects.filter(
-            user=user, recipe=get_object_or_404(Recipe, id=recipe)
-        ).exists():
-            raise serializers.ValidationError(error_message)
-        return self.initial_data
-
     def to_representation(self, instance):
         """Возвращаем в ответе словарь объектов."""
         data = super().to_representation(instance)
         return data["recipe"]
 
 
+class BulkRecipeIdsSerializer(serializers.Serializer):
+    """Сериализатор списка id рецептов для массовых операций."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BATCH_IDS,
+    )
+
+    def validate_ids(self, value):
+        """Убираем повторяющиеся id, сохраняя порядок."""
+        return list(dict.fromkeys(value))
+
+
 class ShoppingCartFavoriteViewSetMixin(
     CreateModelMixin, DestroyModelMixin, viewsets.GenericViewSet
 ):
-    """Миксин для вьюсетов списка покупок и избранного."""
+    """
+    Миксин для вьюсетов списка покупок и избранного.
+
+    В атрибуте counter_field указывается счетчик рецепта,
+    который обновляется в одной транзакции с записью
+    вместе с данными из update_related. В атрибуте exists_error
+    указывается ошибка повторного добавления рецепта.
+    """
 
     permission_classes = (IsAuthenticated,)
+    counter_field = None
+    exists_error = None
 
-    def create_from_mixin(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    def create(self, request, *args, **kwargs):
+        """
+        Добавляем рецепт одним запросом INSERT ... ON CONFLICT.
 
-    def perform_create_from_mixin(self, serializer):
-        """Сохраняем автора и рецепт."""
-        recipe_id = self.kwargs.get("recipe_id")
+        Повторное или параллельное добавление не приводит к ошибке
+        базы данных, а отвечает 400.
+        """
+        recipe_id = self.kwargs["recipe_id"]
+        with transaction.atomic():
+            added = self.queryset.model.objects.add_recipes(
+                request.user, [recipe_id]
+            )
+            self.update_bulk_related(added, 1)
         recipe = get_object_or_404(Recipe, id=recipe_id)
-        serializer.save(user=self.request.user, recipe=recipe)
-
-    def delete_from_mixin(self, request, model_class, *args, **kwargs):
-        """Удаляем объект из списка."""
-        recipe = get_object_or_404(Recipe, id=self.kwargs["recipe_id"])
-        is_in_shopping_cart = model_class.objects.filter(
-            user=self.request.user, recipe=recipe
-        )
-        if not is_in_shopping_cart:
+        if not added:
             return Response(
-                {"errors": "Рецепт еще не добавлен добавлен."},
+                {"errors": self.exists_error},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        is_in_shopping_cart.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(
+            RecipeReadShortSerializer(
+                recipe, context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    def delete(self, request, *args, **kwargs):
+        """Удаляем рецепт одним запросом DELETE."""
+        recipe_id = self.kwargs["recipe_id"]
+        with transaction.atomic():
+            removed = self.queryset.model.objects.remove_recipes(
+                request.user, [recipe_id]
+            )
+            self.update_bulk_related(removed, -1)
+        if removed:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(Recipe, id=recipe_id)
+        return Response(
+            {"errors": "Рецепт еще не добавлен."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def update_counter(self, recipe_ids, delta):
+        """Изменяем счетчик рецептов, не опуская его ниже нуля."""
+        Recipe.objects.filter(pk__in=recipe_ids).update(
+            **{
+                self.counter_field: Greatest(
+                    F(self.counter_field) + delta, 0
+                )
+            }
+        )
+
+    def update_related(self, recipe_ids, delta):
+        """Обновляем данные, зависящие от добавления или удаления записей."""
+
+    def bulk_add(self, request, *args, **kwargs):
+        """
+        Добавляем несколько рецептов одним запросом.
+
+        Возвращаем результат для каждого переданного id.
+        """
+        recipe_ids = self.get_bulk_recipe_ids(request)
+        with transaction.atomic():
+            found = self.get_found_recipe_ids(recipe_ids)
+            added = self.queryset.model.objects.add_recipes(
+                request.user, found
+            )
+            self.update_bulk_related(added, 1)
+        results = dict.fromkeys(recipe_ids, BULK_NOT_FOUND)
+        results.update(dict.fromkeys(found, BULK_EXISTS))
+        results.update(dict.fromkeys(added, BULK_ADDED))
+        return Response({"results": results})
+
+    def bulk_remove(self, request, *args, **kwargs):
+        """
+        Удаляем несколько рецептов одним запросом.
+
+        Возвращаем результат для каждого переданного id.
+        """
+        recipe_ids = self.get_bulk_recipe_ids(request)
+        with transaction.atomic():
+            found = self.get_found_recipe_ids(recipe_ids)
+            removed = self.queryset.model.objects.remove_recipes(
+                request.user, found
+            )
+            self.update_bulk_related(removed, -1)
+        results = dict.fromkeys(recipe_ids, BULK_NOT_FOUND)
+        results.update(dict.fromkeys(found, BULK_MISSING))
+        results.update(dict.fromkeys(removed, BULK_REMOVED))
+        return Response({"results": results})
+
+    def get_bulk_recipe_ids(self, request):
+        """Получаем список id рецептов из тела запроса."""
+        serializer = BulkRecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data[BATCH_IDS_PARAM]
+
+    def get_found_recipe_ids(self, recipe_ids):
+        """Проверяем существование рецептов одним запросом."""
+        return set(
+            Recipe.objects.filter(pk__in=recipe_ids).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def update_bulk_related(self, recipe_ids, delta):
+        """Обновляем счетчики и связанные данные измененных рецептов."""
+        if recipe_ids:
+            self.update_counter(recipe_ids, delta)
+            self.update_related(recipe_ids, delta)
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для условных GET-запросов.
+
+    Валидаторы ETag и Last-Modified вычисляются до сериализации,
+    на совпадающие If-None-Match и If-Modified-Since отвечаем 304.
+    """
+
+    def get_validators(self):
+        """Возвращаем ETag и время последнего изменения."""
+        return None, None
+
+    def get_conditional_response(
+        self, request, render, etag=None, last_modified=None
+    ):
+        """Отвечаем 304 или строим ответ функцией render."""
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = render()
+        if etag is not None:
+            response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        render = super().list
+        etag, last_modified = self.get_validators()
+        return self.get_conditional_response(
+            request,
+            lambda: render(request, *args, **kwargs),
+            etag,
+            last_modified,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        render = super().retrieve
+        etag, last_modified = self.get_validators()
+        return self.get_conditional_response(
+            request,
+            lambda: render(request, *args, **kwargs),
+            etag,
+            last_modified,
+        )
+
+
+def get_content_encoding(request, encodings):
+    """
+    Выбираем способ сжатия по заголовку Accept-Encoding.
+
+    Учитываем только доступные способы сжатия с ненулевым весом.
+    """
+    accepted = {}
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        weight = 1.0
+        name, _, value = params.partition("=")
+        if name.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        accepted[coding.strip().lower()] = weight
+    for encoding in CATALOG_ENCODINGS:
+        if (
+            encoding in encodings
+            and accepted.get(encoding, accepted.get("*", 0)) > 0
+        ):
+            return encoding
+    return IDENTITY
+
+
+class CatalogMixin(ConditionalGetMixin):
+    """
+    Миксин для справочников, которые выдаются целиком.
+
+    Список без параметров запроса для клиентов, принимающих сжатие,
+    рендерим в JSON один раз для каждой версии справочника,
+    сжимаем и отдаем из кэша готовыми байтами.
+    """
+
+    catalog_version_key = None
+
+    def get_validators(self):
+        return self.get_version_validators(
+            get_version(self.catalog_version_key)
+        )
+
+    def get_version_validators(self, version):
+        """
+        Получаем ETag по версии справочника.
+
+        Last-Modified не отдаем: в нем нет долей секунды, и второе
+        изменение справочника за секунду осталось бы незамеченным.
+        """
+        return quote_etag(f"{self.catalog_version_key}-{version}"), None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+        encoding = get_content_encoding(request, CATALOG_COMPRESSORS)
+        if encoding == IDENTITY:
+            response = super().list(request, *args, **kwargs)
+        else:
+            version = get_version(self.catalog_version_key)
+            etag, last_modified = self.get_version_validators(version)
+            # Сжатое представление побайтно отличается от несжатого.
+            response = self.get_conditional_response(
+                request,
+                lambda: self.get_catalog_response(version, encoding),
+                f"W/{etag}",
+                last_modified,
+            )
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    def render_catalog(self):
+        """Рендерим справочник целиком в JSON."""
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return self.request.accepted_renderer.render(serializer.data)
+
+    def get_catalog_response(self, version, encoding):
+        """Отдаем справочник из кэша, сжатый выбранным способом."""
+        catalog = get_cached_catalog(
+            self.catalog_version_key, version, self.render_catalog
+        )
+        response = HttpResponse(
+            catalog[encoding],
+            content_type=self.request.accepted_renderer.media_type,
+        )
+        response["Content-Encoding"] = encoding
+        return response
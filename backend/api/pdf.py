@@ -0,0 +1,70 @@
+from tempfile import SpooledTemporaryFile
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from api.constants import (
+    BOTTOM_Y,
+    LINE_SPACING,
+    PDF_FONT_FILE,
+    PDF_FONT_NAME,
+    PDF_SPOOL_SIZE,
+    START_Y,
+    TEXT_FONT_SIZE,
+    TEXT_X,
+    TITLE_FONT_SIZE,
+    TITLE_X,
+    TITLE_Y,
+)
+
+
+def register_fonts():
+    """Регистрируем шрифт с кириллицей при первом построении PDF."""
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, PDF_FONT_FILE))
+
+
+def get_shopping_list_line(ingredient):
+    """Получаем строку списка покупок."""
+    return (
+        f"{ingredient['name']} ({ingredient['measurement_unit']}) "
+        f"— {ingredient['total_amount']}"
+    )
+
+
+def render_shopping_list(ingredients, output):
+    """
+    Рисуем список покупок в PDF и записываем его в output.
+
+    Когда строки доходят до нижнего края, начинаем новую страницу.
+    Содержимое страниц сжимается, поэтому в памяти остаются
+    только сжатые потоки завершенных страниц.
+    """
+    register_fonts()
+    pdf = canvas.Canvas(output, pageCompression=1)
+    pdf.setFont(PDF_FONT_NAME, TITLE_FONT_SIZE)
+    pdf.drawString(TITLE_X, TITLE_Y, "Список покупок")
+    pdf.setFont(PDF_FONT_NAME, TEXT_FONT_SIZE)
+    y = START_Y
+    for ingredient in ingredients:
+        if y < BOTTOM_Y:
+            pdf.showPage()
+            pdf.setFont(PDF_FONT_NAME, TEXT_FONT_SIZE)
+            y = TITLE_Y
+        pdf.drawString(TEXT_X, y, get_shopping_list_line(ingredient))
+        y -= LINE_SPACING
+    pdf.showPage()
+    pdf.save()
+
+
+def get_shopping_list_pdf(ingredients):
+    """
+    Получаем файл с PDF списка покупок для потоковой отдачи.
+
+    Небольшие документы остаются в памяти, большие сбрасываются на диск.
+    """
+    output = SpooledTemporaryFile(max_size=PDF_SPOOL_SIZE)
+    render_shopping_list(ingredients, output)
+    output.seek(0)
+    return output
@@ -0,0 +1,51 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from api.constants import CSV, PDF, TXT
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Рендерер формата выгрузки списка покупок.
+
+    Выгрузка отдается потоковым ответом в обход рендерера,
+    поэтому через рендерер проходят только ответы об ошибках.
+    Их отдаем в JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        json_renderer = JSONRenderer()
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = json_renderer.media_type
+        return json_renderer.render(data)
+
+
+class PDFRenderer(ExportRenderer):
+    """Рендерер выгрузки в PDF."""
+
+    media_type = "application/pdf"
+    format = PDF
+    charset = None
+
+
+class PlainTextRenderer(ExportRenderer):
+    """Рендерер выгрузки в текст."""
+
+    media_type = "text/plain"
+    format = TXT
+
+
+class CSVRenderer(ExportRenderer):
+    """Рендерер выгрузки в CSV."""
+
+    media_type = "text/csv"
+    format = CSV
+
+
+# PDF идет первым и выбирается, если клиент не указал формат
+SHOPPING_LIST_RENDERERS = (
+    PDFRenderer,
+    JSONRenderer,
+    PlainTextRenderer,
+    CSVRenderer,
+)
@@ -1,8 +1,12 @@
 import re
 
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.manager import BaseManager
 from django.forms import ValidationError
 from rest_framework import serializers
 
+from api.cache import get_cached_recipes
 from api.constants import MAX_AMOUNT, MIN_AMOUNT
 from api.mixins import ShoppingCartFavoriteSerializerMixin
 from recipes.models import (
@@ -11,8 +15,10 @@ from recipes.models import (
     Recipe,
     RecipeIngredient,
     ShoppingCart,
+    ShoppingListItem,
     Tag,
 )
+from users.models import Subscribe
 from users.serializers import Base64ImageField, CustomUserSerializer
 
 
@@ -57,6 +63,20 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         model = RecipeIngredient
 
 
+class ShoppingListItemSerializer(serializers.ModelSerializer):
+    """Сериализатор суммарного списка покупок."""
+
+    id = serializers.ReadOnlyField(source="ingredient.id")
+    name = serializers.ReadOnlyField(source="ingredient.name")
+    measurement_unit = serializers.ReadOnlyField(
+        source="ingredient.measurement_unit"
+    )
+
+    class Meta:
+        fields = ("id", "name", "measurement_unit", "amount")
+        model = ShoppingListItem
+
+
 class ShoppingCartSerializer(ShoppingCartFavoriteSerializerMixin):
     """Сериализатор для списка покупок."""
 
@@ -64,15 +84,6 @@ class ShoppingCartSerializer(ShoppingCartFavoriteSerializerMixin):
         model = ShoppingCart
         fields = ("recipe",)
 
-    def create(self, validated_data):
-        return self.create_recipe_and_user(ShoppingCart, validated_data)
-
-    def validate(self, data):
-        """Валидация подписки на пользователя."""
-        return self.validate_recipe_and_user(
-            ShoppingCart, {"errors": "Этот рецепт уже в списке покупок."}
-        )
-
 
 class FavoriteSerializer(ShoppingCartFavoriteSerializerMixin):
     """Сериализатор для модели избранного."""
@@ -81,18 +92,50 @@ class FavoriteSerializer(ShoppingCartFavoriteSerializerMixin):
         model = Favorite
         fields = ("recipe",)
 
-    def create(self, validated_data):
-        return self.create_recipe_and_user(Favorite, validated_data)
 
-    def validate(self, data):
-        """Валидация подписки на пользователя."""
-        return self.validate_recipe_and_user(
-            Favorite, {"errors": "Этот рецепт уже в избранном."}
-        )
+def serialize_shared_recipes(recipes):
+    """Строим представления рецептов без данных текущего пользователя."""
+    prefetch_related_objects(
+        recipes,
+        "author",
+        "tags",
+        Prefetch(
+            "recipe_ingredients",
+            queryset=RecipeIngredient.objects.select_related("ingredient"),
+        ),
+    )
+    return list(RecipeReadSerializer(recipes, many=True).data)
+
+
+class RecipeReadListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор списка рецептов.
+
+    Общую для всех пользователей часть рецептов берем из кэша,
+    связанные объекты подгружаем только для отсутствующих в кэше.
+    """
+
+    def to_representation(self, data):
+        if not self.child.uses_shared_cache():
+            return super().to_representation(data)
+        recipes = list(data.all() if isinstance(data, BaseManager) else data)
+        return [
+            self.child.add_viewer_fields(recipe, shared)
+            for recipe, shared in zip(
+                recipes, get_cached_recipes(recipes, serialize_shared_recipes)
+            )
+        ]
 
 
 class RecipeReadSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения модели рецепта."""
+    """
+    Сериализатор для чтения модели рецепта.
+
+    Без запроса в контексте строит общее для всех пользователей
+    представление, которое хранится в кэше.
+    Набор полей в контексте (fields) ограничивает представление,
+    такие представления не кэшируются.
+    """
 
     author = CustomUserSerializer(many=False, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -116,18 +159,100 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "cooking_time",
         )
         model = Recipe
+        list_serializer_class = RecipeReadListSerializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        if selected is None:
+            return fields
+        return {
+            name: field for name, field in fields.items() if name in selected
+        }
+
+    def uses_shared_cache(self):
+        """Проверяем, строится ли полное представление для запроса."""
+        return (
+            "request" in self.context
+            and self.context.get("fields") is None
+        )
 
-    def get_is_favorited(self, obj):
-        user = self.context["request"].user
-        return user.is_authenticated and obj.is_favorite.filter(
-            user=user
+    def to_representation(self, instance):
+        if not self.uses_shared_cache():
+            return super().to_representation(instance)
+        shared, = get_cached_recipes([instance], serialize_shared_recipes)
+        return self.add_viewer_fields(instance, shared)
+
+    def add_viewer_fields(self, instance, data):
+        """Дополняем общее представление рецепта данными пользователя."""
+        request = self.context["request"]
+        author = {
+            **data["author"],
+            "is_subscribed": self.get_is_author_subscribed(instance),
+        }
+        if author["avatar"]:
+            author["avatar"] = request.build_absolute_uri(author["avatar"])
+        image = data["image"]
+        if image:
+            image = request.build_absolute_uri(image)
+        return {
+            **data,
+            "author": author,
+            "is_favorited": self.get_is_favorited(instance),
+            "is_in_shopping_cart": self.get_is_in_shopping_cart(instance),
+            "image": image,
+        }
+
+    def get_viewer(self):
+        """Получаем авторизованного пользователя из запроса."""
+        request = self.context.get("request")
+        if request is None or not request.user.is_authenticated:
+            return None
+        return request.user
+
+    def get_is_author_subscribed(self, obj):
+        """
+        Проверяем, подписан ли пользователь на автора рецепта.
+
+        Используем аннотацию из queryset вьюсета, если она есть.
+        """
+        user = self.get_viewer()
+        if user is None:
+            return False
+        author_subscribed = getattr(obj, "author_subscribed", None)
+        if author_subscribed is not None:
+            return author_subscribed
+        return Subscribe.objects.filter(
+            user=user, subscription_id=obj.author_id
         ).exists()
 
+    def get_is_favorited(self, obj):
+        """
+        Проверяем, добавлен ли рецепт в избранное.
+
+        Используем аннотацию из queryset вьюсета, если она есть.
+        """
+        user = self.get_viewer()
+        if user is None:
+            return False
+        favorited = getattr(obj, "favorited", None)
+        if favorited is not None:
+            return favorited
+        return obj.is_favorite.filter(user=user).exists()
+
     def get_is_in_shopping_cart(self, obj):
-        user = self.context["request"].user
-        return user.is_authenticated and obj.is_in_shopping_cart.filter(
-            user=user
-        ).exists()
+        """
+        Проверяем, добавлен ли рецепт в список покупок.
+
+        Используем аннотацию из queryset вьюсета, если она есть.
+        """
+        user = self.get_viewer()
+        if user is None:
+            return False
+        in_shopping_cart = getattr(obj, "in_shopping_cart", None)
+        if in_shopping_cart is not None:
+            return in_shopping_cart
+        return obj.is_in_shopping_cart.filter(user=user).exists()
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
@@ -214,6 +339,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         ]
         RecipeIngredient.objects.bulk_create(recipe_ingredients)
 
+    @transaction.atomic
     def create(self, validated_data):
         """Сохраняем ингридиенты и тэги."""
         ingredients_data = validated_data.pop("ingredients")
@@ -225,6 +351,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Метод для обновления рецепта."""
         ingredients_data = validated_data.pop("ingredients", None)
@@ -242,6 +369,8 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             instance.tags.set(tags_data)
 
         if ingredients_data is not None:
+            ShoppingListItem.objects.remove_recipe(instance)
             instance.recipe_ingredients.all().delete()
             self.add_ingredients_to_recipe(instance, ingredients_data)
+            ShoppingListItem.objects.add_recipe(instance)
         return instance
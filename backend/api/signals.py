@@ -0,0 +1,210 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from api.cache import delete_on_commit, invalidate_recipes
+from api.constants import INGREDIENTS_VERSION_KEY, TAGS_VERSION_KEY
+from recipes.cache import update_short_link
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+from users.models import Subscribe, User
+
+# Счетчики рецепта для записей избранного и списка покупок
+RECIPE_COUNTERS = {
+    Favorite: "favorites_count",
+    ShoppingCart: "shopping_carts_count",
+}
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    """Сбрасываем кэш измененного рецепта."""
+    invalidate_recipes([instance.pk])
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_short_link(sender, instance, **kwargs):
+    """
+    Обновляем кэш короткой ссылки рецепта.
+
+    Новый рецепт перезаписывает ссылку, если она была
+    закэширована как неизвестная.
+    """
+    if instance.short_link:
+        update_short_link(instance.short_link, instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_recipe_short_link(sender, instance, **kwargs):
+    """Отмечаем короткую ссылку удаленного рецепта неизвестной."""
+    if instance.short_link:
+        update_short_link(instance.short_link)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_save, sender=RecipeTag)
+@receiver(post_delete, sender=RecipeTag)
+def invalidate_recipe_relation(sender, instance, **kwargs):
+    """Сбрасываем кэш рецепта при изменении его ингредиентов и тэгов."""
+    invalidate_recipes([instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Сбрасываем кэш рецептов при изменении связи с тэгами."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_recipes([instance.pk])
+    elif action == "pre_clear":
+        invalidate_recipes(
+            RecipeTag.objects.filter(tags=instance).values_list(
+                "recipe_id", flat=True
+            )
+        )
+    else:
+        invalidate_recipes(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_tag_recipes(sender, instance, created, **kwargs):
+    """Сбрасываем кэш рецептов с измененным тэгом."""
+    if not created:
+        invalidate_recipes(
+            RecipeTag.objects.filter(tags=instance).values_list(
+                "recipe_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=Ingredient)
+def invalidate_ingredient_recipes(sender, instance, created, **kwargs):
+    """Сбрасываем кэш рецептов с измененным ингредиентом."""
+    if not created:
+        invalidate_recipes(
+            RecipeIngredient.objects.filter(ingredient=instance).values_list(
+                "recipe_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_recipes(
+    sender, instance, created, update_fields, **kwargs
+):
+    """Сбрасываем кэш рецептов автора при изменении его профиля."""
+    if created or update_fields == frozenset(("last_login",)):
+        return
+    invalidate_recipes(
+        Recipe.objects.filter(author=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags_version(sender, **kwargs):
+    """Сбрасываем версию списка тэгов."""
+    delete_on_commit([TAGS_VERSION_KEY])
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients_version(sender, **kwargs):
+    """Сбрасываем версию списка ингредиентов."""
+    delete_on_commit([INGREDIENTS_VERSION_KEY])
+
+
+def change_user_counter(user_id, field, delta):
+    """Изменяем счетчик пользователя, не опуская его ниже нуля."""
+    User.objects.filter(pk=user_id).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def increase_recipe_counter(sender, instance, created, **kwargs):
+    """
+    Увеличиваем счетчик рецепта при создании записи через ORM.
+
+    API добавляет записи запросом INSERT без сигналов
+    и обновляет счетчики само.
+    """
+    if created:
+        field = RECIPE_COUNTERS[sender]
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            **{field: F(field) + 1}
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def decrease_recipe_counter(sender, instance, **kwargs):
+    """
+    Уменьшаем счетчик рецепта при удалении записи через ORM,
+    в том числе каскадном вместе с пользователем.
+    """
+    field = RECIPE_COUNTERS[sender]
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        **{field: Greatest(F(field) - 1, 0)}
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increase_recipes_count(sender, instance, created, **kwargs):
+    """Увеличиваем счетчик рецептов автора, в том числе из админки."""
+    if created:
+        change_user_counter(instance.author_id, "recipes_count", 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrease_recipes_count(sender, instance, **kwargs):
+    """Уменьшаем счетчик рецептов автора, в том числе при каскаде."""
+    change_user_counter(instance.author_id, "recipes_count", -1)
+
+
+@receiver(post_save, sender=Subscribe)
+def increase_subscribers_count(sender, instance, created, **kwargs):
+    """Увеличиваем счетчик подписчиков автора."""
+    if created:
+        change_user_counter(instance.subscription_id, "subscribers_count", 1)
+
+
+@receiver(post_delete, sender=Subscribe)
+def decrease_subscribers_count(sender, instance, **kwargs):
+    """
+    Уменьшаем счетчик подписчиков автора.
+
+    Срабатывает и при каскадном удалении подписок вместе
+    с подписчиком.
+    """
+    change_user_counter(instance.subscription_id, "subscribers_count", -1)
+
+
+@receiver(pre_delete, sender=Recipe)
+def subtract_deleted_recipe(sender, instance, **kwargs):
+    """
+    Вычитаем ингредиенты удаляемого рецепта из списков покупок.
+
+    Срабатывает при любом удалении рецепта, в том числе каскадном
+    вместе с автором, пока корзины и ингредиенты рецепта еще есть.
+    """
+    ShoppingListItem.objects.remove_recipe(instance)
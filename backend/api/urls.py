@@ -1,4 +1,4 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (
@@ -6,8 +6,10 @@ from api.views import (
     IngredientViewSet,
     RecipeViewSet,
     ShoppingCartViewSet,
+    ShoppingListSummaryView,
     TagViewset,
     download_shopping_cart,
+    shopping_list_job,
 )
 
 v1_router = DefaultRouter()
@@ -31,5 +33,27 @@ urlpatterns = [
         download_shopping_cart,
         name="download_shopping_cart",
     ),
+    re_path(
+        r"^recipes/download_shopping_cart/(?P<job_id>[0-9a-f]{64})/$",
+        shopping_list_job,
+        name="shopping_list_job",
+    ),
+    path(
+        "recipes/shopping_cart/summary/",
+        ShoppingListSummaryView.as_view(),
+        name="shopping_cart_summary",
+    ),
+    path(
+        "recipes/shopping_cart/bulk/",
+        ShoppingCartViewSet.as_view(
+            {"post": "bulk_add", "delete": "bulk_remove"}
+        ),
+        name="shopping_cart_bulk",
+    ),
+    path(
+        "recipes/favorite/bulk/",
+        FavoriteViewSet.as_view({"post": "bulk_add", "delete": "bulk_remove"}),
+        name="favorite_bulk",
+    ),
     path("", include(v1_router.urls)),
 ]
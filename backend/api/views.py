@@ -1,13 +1,42 @@
-from collections import defaultdict
-
-from django.db.models import Q
-from django.http import HttpResponse
+import hashlib
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+)
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Value,
+    When,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import MD5, Cast, Concat
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import filters, generics, status, viewsets
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+    renderer_classes,
+)
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import (
     SAFE_METHODS,
     IsAuthenticated,
@@ -15,84 +44,317 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
+from api.autocomplete import get_ingredient_index
+from api.cache import get_recipe_version
 from api.constants import (
+    ALL_TAGS,
+    BATCH_IDS_PARAM,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FILENAME,
     FALSE,
-    LINE_SPACING,
-    START_Y,
-    TEXT_FONT_SIZE,
-    TEXT_X,
-    TITLE_FONT_SIZE,
-    TITLE_X,
-    TITLE_Y,
+    FIELDS_PARAM,
+    INGREDIENTS_LIMIT_PARAM,
+    INGREDIENTS_VERSION_KEY,
+    JOB_PENDING,
+    JOB_READY,
+    MAX_BATCH_IDS,
+    MAX_INGREDIENTS_LIMIT,
+    OMIT_PARAM,
+    PDF,
+    SEARCH_PARAM,
+    SPARSE_COLUMNS,
+    TAGS_MATCH_PARAM,
+    TAGS_VERSION_KEY,
     TRUE,
 )
-from api.mixins import ShoppingCartFavoriteViewSetMixin
+from api.documents import get_document_key, open_document, store_document
+from api.exports import EXPORTS
+from api.jobs import get_job_status, start_render_job
+from api.mixins import (
+    CatalogMixin,
+    ConditionalGetMixin,
+    ShoppingCartFavoriteViewSetMixin,
+)
+from api.pdf import get_shopping_list_pdf
 from api.permissions import AuthorOrReadOnlyPermission
+from api.renderers import SHOPPING_LIST_RENDERERS
 from api.serializers import (
     FavoriteSerializer,
     IngredientSerializer,
     RecipeReadSerializer,
     RecipeWriteSerializer,
     ShoppingCartSerializer,
+    ShoppingListItemSerializer,
     TagSerializer,
 )
-from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.constants import SEARCH_CONFIG, SEARCH_VECTOR_COLUMN
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+from recipes.paginations import CursorPaginationMixin, RecipeCursorPagination
+from users.models import Subscribe, User
 
 
-@api_view(["GET"])
+@api_view(["GET", "POST"])
 @permission_classes((IsAuthenticated,))
+@renderer_classes(SHOPPING_LIST_RENDERERS)
 def download_shopping_cart(request):
-    """Функция для выгрузки списка покупок pdf-документом."""
+    """
+    Функция для выгрузки списка покупок.
+
+    Формат выбираем параметром format или заголовком Accept,
+    по умолчанию выгружаем pdf-документ. ETag - хэш содержимого
+    списка и формата, pdf-документы храним в кэше по этому хэшу.
+    Текст, CSV и JSON строим потоком из курсора базы данных,
+    хэш их содержимого считает база данных.
+    POST-запрос для большого списка запускает фоновое задание
+    построения pdf-документа, небольшие списки отдаем сразу.
+    """
+    renderer = request.accepted_renderer
     ingredients = get_aggregatted_ingredients(request.user)
-
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = "attachment; filename='shoppinglist.pdf'"
-    p = canvas.Canvas(response)
-    pdfmetrics.registerFont(TTFont("DejaVuSans", "DejaVuSans.ttf"))
-
-    p.setFont("DejaVuSans", TITLE_FONT_SIZE)
-    p.drawString(TITLE_X, TITLE_Y, "Список покупок")
-
-    p.setFont("DejaVuSans", TEXT_FONT_SIZE)
-    y = START_Y
-    for ingredient, data in ingredients.items():
-        p.drawString(
-            TEXT_X,
-            y,
-            f"{ingredient} ({data['measurement_unit']}) "
-            f"— {data['amount']}",
+    if renderer.format != PDF:
+        key = get_document_key(
+            get_shopping_list_digest(request.user), renderer.format
+        )
+        return get_conditional_shopping_list_response(
+            request,
+            key,
+            lambda: get_shopping_list_response(
+                ingredients.iterator(chunk_size=EXPORT_CHUNK_SIZE),
+                renderer,
+                key,
+            ),
         )
-        y -= LINE_SPACING
+    ingredients = list(ingredients)
+    key = get_document_key(ingredients, renderer.format)
+    if (
+        request.method == "POST"
+        and len(ingredients) >= settings.DOCUMENT_JOB_THRESHOLD
+    ):
+        return get_shopping_list_job_response(request, key, ingredients)
+    return get_conditional_shopping_list_response(
+        request,
+        key,
+        lambda: get_shopping_list_response(ingredients, renderer, key),
+    )
+
+
+def get_conditional_shopping_list_response(request, key, render):
+    """Отвечаем 304 по ETag или строим выгрузку функцией render."""
+    etag = quote_etag(key)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render()
+    response["ETag"] = etag
+    patch_cache_control(response, private=True)
+    return response
+
 
-    p.showPage()
-    p.save()
+@api_view(["GET"])
+@permission_classes((IsAuthenticated,))
+def shopping_list_job(request, job_id):
+    """
+    Функция для получения результата фонового задания.
+
+    Готовый документ отдаем файлом, иначе отдаем статус задания.
+    Id задания - ключ документа в кэше документов. Статус читаем
+    до документа: задание могло завершиться между проверками.
+    """
+    job_status = get_job_status(job_id)
+    document = open_document(job_id, PDF)
+    if document is not None:
+        response = get_pdf_response(document)
+        response["ETag"] = quote_etag(job_id)
+        patch_cache_control(response, private=True)
+        return response
+    if job_status is None:
+        raise NotFound("Задание не найдено.")
+    return Response(
+        {"id": job_id, "status": job_status},
+        status=(
+            status.HTTP_202_ACCEPTED
+            if job_status == JOB_PENDING
+            else status.HTTP_200_OK
+        ),
+    )
+
+
+def get_shopping_list_job_response(request, key, ingredients):
+    """
+    Запускаем фоновое задание, если документа еще нет в кэше.
+
+    Статус читаем до документа: задание могло уже завершиться.
+    """
+    document = open_document(key, PDF)
+    if document is None:
+        start_render_job(key, ingredients)
+        job_status = get_job_status(key) or JOB_PENDING
+        document = open_document(key, PDF)
+    if document is not None:
+        document.close()
+        job_status = JOB_READY
+    url = request.build_absolute_uri(
+        reverse("shopping_list_job", args=(key,))
+    )
+    return Response(
+        {"id": key, "status": job_status, "url": url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": url},
+    )
+
+
+def get_pdf_response(document):
+    """Отдаем pdf-документ списка покупок файлом."""
+    return FileResponse(
+        document,
+        as_attachment=True,
+        filename=f"{EXPORT_FILENAME}.{PDF}",
+        content_type="application/pdf",
+    )
+
+
+def get_shopping_list_response(ingredients, renderer, key):
+    """Отдаем список покупок в формате, выбранном рендерером."""
+    if renderer.format == PDF:
+        return get_pdf_response(
+            open_document(key, PDF)
+            or store_document(key, PDF, get_shopping_list_pdf(ingredients))
+        )
+    filename = f"{EXPORT_FILENAME}.{renderer.format}"
+    response = StreamingHttpResponse(
+        EXPORTS[renderer.format](ingredients),
+        content_type=f"{renderer.media_type}; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
 
 def get_aggregatted_ingredients(user):
-    """Получаем ингредиенты для списка покупок."""
+    """
+    Получаем ингредиенты для списка покупок.
+
+    Читаем суммарный список покупок пользователя. Ингредиенты
+    с одинаковым названием и разными единицами измерения не объединяем.
+    """
+    return (
+        ShoppingListItem.objects.filter(user=user)
+        .values(
+            name=F("ingredient__name"),
+            measurement_unit=F("ingredient__measurement_unit"),
+            total_amount=F("amount"),
+        )
+        .order_by("name", "measurement_unit")
+    )
+
+
+def get_shopping_list_digest(user):
+    """
+    Получаем хэш содержимого списка покупок пользователя.
+
+    Строки списка склеивает и хэширует база данных,
+    поэтому список не загружаем в память ради ETag.
+    """
+    line = Concat(
+        "ingredient__name",
+        Value("\t"),
+        "ingredient__measurement_unit",
+        Value("\t"),
+        Cast("amount", output_field=CharField()),
+        output_field=CharField(),
+    )
+    return ShoppingListItem.objects.filter(user=user).aggregate(
+        digest=MD5(
+            StringAgg(
+                line,
+                delimiter="\n",
+                ordering=(
+                    "ingredient__name",
+                    "ingredient__measurement_unit",
+                ),
+            )
+        )
+    )["digest"]
 
-    recipies = Recipe.objects.filter(
-        is_in_shopping_cart__user=user
-    ).prefetch_related("recipe_ingredients")
 
-    ingredients = defaultdict(lambda: {"amount": 0, "measurement_unit": ""})
+def filter_by_tags(queryset, tags, match_all=False):
+    """
+    Фильтруем рецепты по слагам тэгов.
 
-    for recipe in recipies:
-        for recipe_ingredient in recipe.recipe_ingredients.all():
-            ingredient = recipe_ingredient.ingredient
-            ingredients[ingredient.name]["amount"] += recipe_ingredient.amount
-            if not ingredients[ingredient.name]["measurement_unit"]:
-                ingredients[ingredient.name]["measurement_unit"] = (
-                    ingredient.measurement_unit
+    Используем подзапрос EXISTS вместо JOIN с DISTINCT.
+    По умолчанию рецепт должен иметь любой из тэгов, при match_all - все.
+    """
+    if not match_all:
+        return queryset.filter(
+            Exists(
+                RecipeTag.objects.filter(
+                    recipe=OuterRef("pk"), tags__slug__in=tags
                 )
-
-    return dict(ingredients)
+            )
+        )
+    for tag in set(tags):
+        queryset = queryset.filter(
+            Exists(
+                RecipeTag.objects.filter(recipe=OuterRef("pk"), tags__slug=tag)
+            )
+        )
+    return queryset
+
+
+def search_recipes(queryset, text):
+    """
+    Полнотекстовый поиск рецептов по названию и описанию.
+
+    Используем вычисляемую колонку с GIN-индексом,
+    сортируем по релевантности, затем по дате публикации.
+    """
+    search_vector = RawSQL(
+        f'"{Recipe._meta.db_table}"."{SEARCH_VECTOR_COLUMN}"',
+        [],
+        output_field=SearchVectorField(),
+    )
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        queryset.alias(search_vector=search_vector)
+        .filter(search_vector=query)
+        .annotate(search_rank=SearchRank(search_vector, query))
+        .order_by("-search_rank", "-pub_date")
+    )
+
+
+def search_ingredients(queryset, name):
+    """
+    Поиск ингредиентов по части названия без учета регистра.
+
+    Поиск использует триграммный GIN-индекс. Сначала идут ингредиенты,
+    название которых начинается с искомой строки, затем остальные,
+    внутри каждой группы - по алфавиту.
+    """
+    return (
+        queryset.filter(name__icontains=name)
+        .alias(
+            is_prefix=Case(
+                When(name__istartswith=name, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+        .order_by("-is_prefix", "name")
+    )
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalGetMixin, CursorPaginationMixin, viewsets.ModelViewSet
+):
     """Вьюсет для модели рецепта."""
 
+    cursor_pagination_class = RecipeCursorPagination
     filter_backends = (filters.OrderingFilter, DjangoFilterBackend)
 
     def get_queryset(self):
@@ -108,26 +370,113 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if author:
             queryset = queryset.filter(author__id=author)
 
+        search = self.request.query_params.get(SEARCH_PARAM)
+        if search:
+            queryset = search_recipes(queryset, search)
+
         if tags:
-            queryset = queryset.filter(tags__slug__in=tags).distinct()
+            queryset = filter_by_tags(
+                queryset,
+                tags,
+                match_all=self.request.query_params.get(TAGS_MATCH_PARAM)
+                == ALL_TAGS,
+            )
 
         user = self.request.user
         if user.is_authenticated:
+            queryset = queryset.annotate(
+                favorited=Exists(
+                    Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+                ),
+                in_shopping_cart=Exists(
+                    ShoppingCart.objects.filter(
+                        user=user, recipe=OuterRef("pk")
+                    )
+                ),
+                author_subscribed=Exists(
+                    Subscribe.objects.filter(
+                        user=user, subscription=OuterRef("author")
+                    )
+                ),
+            )
             if is_favorited:
                 if is_favorited == TRUE:
-                    queryset = queryset.filter(is_favorite__user=user)
+                    queryset = queryset.filter(favorited=True)
                 elif is_favorited == FALSE:
-                    queryset = queryset.exclude(is_favorite__user=user)
+                    queryset = queryset.filter(favorited=False)
             if is_in_shopping_cart:
                 if is_in_shopping_cart == TRUE:
-                    queryset = queryset.filter(is_in_shopping_cart__user=user)
+                    queryset = queryset.filter(in_shopping_cart=True)
                 elif is_in_shopping_cart == FALSE:
-                    queryset = queryset.exclude(is_in_shopping_cart__user=user)
+                    queryset = queryset.filter(in_shopping_cart=False)
+
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            queryset = self.apply_sparse_fields(queryset, fields)
+        return queryset
+
+    def get_sparse_fields(self):
+        """
+        Получаем набор полей рецепта из параметров fields и omit.
+
+        Возвращаем None, если запрошено полное представление.
+        """
+        if self.request.method not in SAFE_METHODS:
+            return None
+        fields = self.request.query_params.get(FIELDS_PARAM)
+        omit = self.request.query_params.get(OMIT_PARAM)
+        if fields is None and omit is None:
+            return None
+        selected = set(RecipeReadSerializer.Meta.fields)
+        if fields is not None:
+            selected &= set(fields.split(",")) | {"id"}
+        if omit is not None:
+            selected -= set(omit.split(",")) - {"id"}
+        return selected
+
+    def apply_sparse_fields(self, queryset, fields):
+        """
+        Подгружаем только нужные сериализатору связи и колонки.
+
+        Количество запросов не зависит от количества рецептов на странице.
+        """
+        queryset = queryset.defer(
+            *(
+                column
+                for field, column in SPARSE_COLUMNS.items()
+                if field not in fields
+            )
+        )
+        if "author" in fields:
+            authors = User.objects.all()
+            user = self.request.user
+            if user.is_authenticated:
+                authors = authors.annotate(
+                    subscribed=Exists(
+                        Subscribe.objects.filter(
+                            user=user, subscription=OuterRef("pk")
+                        )
+                    )
+                )
+            queryset = queryset.prefetch_related(
+                Prefetch("author", queryset=authors)
+            )
+        if "tags" in fields:
+            queryset = queryset.prefetch_related("tags")
+        if "ingredients" in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "recipe_ingredients",
+                    queryset=RecipeIngredient.objects.select_related(
+                        "ingredient"
+                    ),
+                )
+            )
         return queryset
 
     def get_serializer_context(self):
         """Добавляем контекст для сериализатора."""
-        return {"request": self.request}
+        return {"request": self.request, "fields": self.get_sparse_fields()}
 
     def get_serializer_class(self):
         """Выбираем соответствующий запросу сериализатор."""
@@ -187,29 +536,108 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
         return Response(response_serializer.data)
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Получаем рецепт с поддержкой условного запроса.
+
+        ETag учитывает версию рецепта и данные пользователя,
+        поэтому Last-Modified не отдаем.
+        """
+        instance = self.get_object()
+        response = self.get_conditional_response(
+            request,
+            lambda: Response(self.get_serializer(instance).data),
+            etag=self.get_recipe_etag(instance),
+        )
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+    def get_recipe_etag(self, instance):
+        """Получаем ETag рецепта для текущего пользователя."""
+        serializer = self.get_serializer()
+        state = ":".join(
+            str(value)
+            for value in (
+                get_recipe_version(instance.pk),
+                self.request.user.pk,
+                serializer.get_is_favorited(instance),
+                serializer.get_is_in_shopping_cart(instance),
+                serializer.get_is_author_subscribed(instance),
+            )
+        )
+        return quote_etag(
+            hashlib.md5(state.encode(), usedforsecurity=False).hexdigest()
+        )
+
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """
+        Получаем рецепты по списку id в порядке запроса.
+
+        Отсутствующие рецепты перечисляем в поле missing.
+        """
+        ids = self.get_batch_ids()
+        recipes = {
+            recipe.pk: recipe
+            for recipe in self.get_queryset().filter(pk__in=ids)
+        }
+        serializer = self.get_serializer(
+            [recipes[recipe_id] for recipe_id in ids if recipe_id in recipes],
+            many=True,
+        )
+        return Response(
+            {
+                "results": serializer.data,
+                "missing": [
+                    recipe_id for recipe_id in ids if recipe_id not in recipes
+                ],
+            }
+        )
+
+    def get_batch_ids(self):
+        """Получаем уникальные id рецептов из параметра ids."""
+        raw_ids = self.request.query_params.get(BATCH_IDS_PARAM, "")
+        try:
+            ids = list(
+                dict.fromkeys(
+                    int(recipe_id) for recipe_id in raw_ids.split(",")
+                )
+            )
+        except ValueError:
+            raise ValidationError(
+                {BATCH_IDS_PARAM: "Укажите id рецептов через запятую."}
+            )
+        if len(ids) > MAX_BATCH_IDS:
+            raise ValidationError(
+                {
+                    BATCH_IDS_PARAM: (
+                        f"Можно запросить не более {MAX_BATCH_IDS} рецептов."
+                    )
+                }
+            )
+        return ids
+
     @action(detail=True, methods=["get"], url_path="get-link")
     def get_link(self, request, pk=None):
         """Получаем короткую ссылку на рецепт."""
         recipe = self.get_object()
-        short_link = recipe.short_link
-        if not short_link:
-            short_link = recipe.generate_short_link()
-            recipe.short_link = short_link
-            recipe.save()
+        if not recipe.short_link:
+            recipe.save(update_fields=["short_link"])
 
-        link = request.build_absolute_uri(f"/s/{short_link}")
+        link = request.build_absolute_uri(f"/s/{recipe.short_link}")
         return Response({"short-link": link}, status=status.HTTP_200_OK)
 
 
-class TagViewset(viewsets.ReadOnlyModelViewSet):
+class TagViewset(CatalogMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для модели тэга."""
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
+    catalog_version_key = TAGS_VERSION_KEY
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для ингредиентов."""
 
     queryset = Ingredient.objects.all()
@@ -218,14 +646,65 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
     ordering_fields = ("id",)
     search_fields = ("^name",)
+    catalog_version_key = INGREDIENTS_VERSION_KEY
+
+    def list(self, request, *args, **kwargs):
+        """
+        Отвечаем на поиск по названию из индекса в памяти процесса.
+
+        Запросы с другими параметрами выполняем через базу данных.
+        """
+        name = request.query_params.get("name")
+        if name is None or not set(request.query_params) <= {
+            "name",
+            INGREDIENTS_LIMIT_PARAM,
+        }:
+            return super().list(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        return self.get_conditional_response(
+            request,
+            lambda: Response(
+                get_ingredient_index().search(name, self.get_limit())
+            ),
+            etag,
+            last_modified,
+        )
 
     def get_queryset(self):
         queryset = Ingredient.objects.all()
         name = self.request.query_params.get("name")
         if name is not None:
-            queryset = queryset.filter(Q(name__icontains=name))
+            queryset = search_ingredients(queryset, name)
         return queryset
 
+    def filter_queryset(self, queryset):
+        """Ограничиваем количество ингредиентов в списке."""
+        queryset = super().filter_queryset(queryset)
+        if self.action == "list":
+            queryset = queryset[: self.get_limit()]
+        return queryset
+
+    def get_limit(self):
+        """
+        Получаем ограничение количества ингредиентов.
+
+        При поиске по названию ответ не превышает MAX_INGREDIENTS_LIMIT.
+        """
+        limit = self.request.query_params.get(INGREDIENTS_LIMIT_PARAM)
+        if limit is None:
+            if "name" in self.request.query_params:
+                return MAX_INGREDIENTS_LIMIT
+            return None
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError(
+                {INGREDIENTS_LIMIT_PARAM: "Укажите положительное число."}
+            )
+        return min(limit, MAX_INGREDIENTS_LIMIT)
+
 
 class ShoppingCartViewSet(ShoppingCartFavoriteViewSetMixin):
     """Вьюсет для списка покупок."""
@@ -233,18 +712,33 @@ class ShoppingCartViewSet(ShoppingCartFavoriteViewSetMixin):
     queryset = ShoppingCart.objects.all()
     serializer_class = ShoppingCartSerializer
     permission_classes = (IsAuthenticated,)
+    counter_field = "shopping_carts_count"
+    exists_error = "Этот рецепт уже в списке покупок."
 
-    def create(self, request, *args, **kwargs):
-        return self.create_from_mixin(request, *args, **kwargs)
+    def update_related(self, recipe_ids, delta):
+        """Изменяем суммарный список покупок пользователя."""
+        if delta > 0:
+            ShoppingListItem.objects.add_user_recipes(
+                self.request.user, recipe_ids
+            )
+        else:
+            ShoppingListItem.objects.remove_user_recipes(
+                self.request.user, recipe_ids
+            )
 
-    def perform_create(self, serializer):
-        """Сохраняем автора и рецепт."""
-        return self.perform_create_from_mixin(serializer=serializer)
 
-    def delete(self, request, *args, **kwargs):
-        """Удаляем объект из избранного."""
-        return self.delete_from_mixin(
-            request, model_class=ShoppingCart, *args, **kwargs
+class ShoppingListSummaryView(generics.ListAPIView):
+    """Суммарный список покупок текущего пользователя."""
+
+    serializer_class = ShoppingListItemSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+
+    def get_queryset(self):
+        return (
+            ShoppingListItem.objects.filter(user=self.request.user)
+            .select_related("ingredient")
+            .order_by("ingredient__name", "ingredient__measurement_unit")
         )
 
 
@@ -253,16 +747,5 @@ class FavoriteViewSet(ShoppingCartFavoriteViewSetMixin):
 
     queryset = Favorite.objects.all()
     serializer_class = FavoriteSerializer
-
-    def create(self, request, *args, **kwargs):
-        return self.create_from_mixin(request, *args, **kwargs)
-
-    def perform_create(self, serializer):
-        """Сохраняем автора и рецепт."""
-        return self.perform_create_from_mixin(serializer=serializer)
-
-    def delete(self, request, *args, **kwargs):
-        """Удаляем объект из избранного."""
-        return self.delete_from_mixin(
-            request, model_class=Favorite, *args, **kwargs
-        )
+    counter_field = "favorites_count"
+    exists_error = "Этот рецепт уже в избранном."
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -28,6 +29,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "django_filters",
@@ -115,6 +117,57 @@ STATIC_ROOT = BASE_DIR / "collected_static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Кэш общий для всех процессов backend и команд manage.py:
+# версии данных не должны расходиться. В docker compose - Redis,
+# без него - файловый кэш во временной папке.
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+)
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "foodgram_cache"),
+        ),
+    }
+}
+if CACHE_BACKEND.endswith(("FileBasedCache", "LocMemCache")):
+    # Количество записей, после которого кэш удаляет треть записей.
+    # Одна страница рецептов записывает около двухсот ключей.
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 100_000))
+    }
+
+# Время жизни кэшированного представления рецепта, секунды
+RECIPE_CACHE_TIMEOUT = int(os.getenv("RECIPE_CACHE_TIMEOUT", 60 * 60 * 24))
+
+# Время хранения сжатого справочника в кэше, секунды
+CATALOG_CACHE_TIMEOUT = int(
+    os.getenv("CATALOG_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+
+# Время хранения id рецепта по короткой ссылке в общем кэше, секунды
+SHORT_LINK_CACHE_TIMEOUT = int(
+    os.getenv("SHORT_LINK_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+
+DOCUMENT_CACHE_DIR = os.getenv(
+    "DOCUMENT_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "foodgram_documents"),
+)
+DOCUMENT_CACHE_MAX_SIZE = int(
+    os.getenv("DOCUMENT_CACHE_MAX_SIZE", 100 * 1024 * 1024)
+)
+DOCUMENT_CACHE_MAX_AGE = int(
+    os.getenv("DOCUMENT_CACHE_MAX_AGE", 60 * 60 * 24)
+)
+# Количество ингредиентов, начиная с которого POST-запрос
+# строит pdf-документ в фоновом задании
+DOCUMENT_JOB_THRESHOLD = int(os.getenv("DOCUMENT_JOB_THRESHOLD", 500))
+# Количество процессов пула фоновых заданий в каждом процессе backend
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", 1))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
@@ -2,7 +2,13 @@ from django.contrib import admin
 from django.utils.html import format_html
 
 from recipes.forms import AdminTagsRecipeForm
-from recipes.models import Favorite, Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingListItem,
+    Tag,
+)
 
 
 class RecipeIngredientInline(admin.TabularInline):
@@ -25,10 +31,16 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = ("tags",)
     search_fields = ("name", "author")
 
+    def save_related(self, request, form, formsets, change):
+        """Обновляем списки покупок при изменении ингредиентов рецепта."""
+        if change:
+            ShoppingListItem.objects.remove_recipe(form.instance)
+        super().save_related(request, form, formsets, change)
+        ShoppingListItem.objects.add_recipe(form.instance)
+
     @admin.display(description="Добавлено в избранное")
     def favorites_count(self, obj):
-        favorite = Favorite.objects.filter(recipe=obj).count()
-        return f"{favorite} раз"
+        return f"{obj.favorites_count} раз"
 
     @admin.display(description="Изображение")
     def image_tag(self, obj):
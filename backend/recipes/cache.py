@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from recipes.constants import (
+    SHORT_LINK_CACHE_KEY,
+    SHORT_LINK_LOCAL_SIZE,
+    SHORT_LINK_LOCAL_TIMEOUT,
+    SHORT_LINK_MISSING,
+    SHORT_LINK_NEGATIVE_TIMEOUT,
+)
+from recipes.models import Recipe
+
+# Короткие ссылки, разрешенные процессом: ссылка - (id, срок годности)
+_short_links = OrderedDict()
+_lock = threading.Lock()
+
+
+def resolve_short_link(short_link):
+    """
+    Получаем id рецепта по короткой ссылке.
+
+    Сначала ищем в LRU процесса, затем в общем кэше и только потом
+    в базе данных. Неизвестные ссылки тоже кэшируем, но ненадолго.
+    Результат базы данных записываем через cache.add: значение,
+    записанное после коммита изменения рецепта, не перезаписываем
+    прочитанным до коммита. Для неизвестной ссылки возвращаем None.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _short_links.get(short_link)
+        if entry is not None and entry[1] > now:
+            _short_links.move_to_end(short_link)
+            return entry[0] or None
+    key = SHORT_LINK_CACHE_KEY.format(short_link)
+    recipe_id = cache.get(key)
+    if recipe_id is None:
+        recipe_id = (
+            Recipe.objects.filter(short_link=short_link)
+            .values_list("id", flat=True)
+            .first()
+        ) or SHORT_LINK_MISSING
+        if not cache.add(
+            key, recipe_id, timeout=get_short_link_timeout(recipe_id)
+        ):
+            recipe_id = cache.get(key, recipe_id)
+    local_timeout = (
+        SHORT_LINK_LOCAL_TIMEOUT if recipe_id else SHORT_LINK_NEGATIVE_TIMEOUT
+    )
+    with _lock:
+        _short_links[short_link] = (recipe_id, now + local_timeout)
+        _short_links.move_to_end(short_link)
+        if len(_short_links) > SHORT_LINK_LOCAL_SIZE:
+            _short_links.popitem(last=False)
+    return recipe_id or None
+
+
+def get_short_link_timeout(recipe_id):
+    """Получаем время хранения ссылки в общем кэше."""
+    if recipe_id:
+        return settings.SHORT_LINK_CACHE_TIMEOUT
+    return SHORT_LINK_NEGATIVE_TIMEOUT
+
+
+def update_short_link(short_link, recipe_id=None):
+    """
+    Обновляем короткую ссылку в кэше после изменения рецепта.
+
+    До коммита транзакции удаляем ссылку из кэша, после коммита
+    записываем id рецепта или, для удаленного рецепта, отметку
+    неизвестной ссылки. Так отрицательное значение, закэшированное
+    до коммита, не переживает создание рецепта. LRU других процессов
+    устаревает не дольше чем через SHORT_LINK_LOCAL_TIMEOUT.
+    """
+    _forget_short_link(short_link)
+    transaction.on_commit(
+        partial(
+            _store_short_link, short_link, recipe_id or SHORT_LINK_MISSING
+        )
+    )
+
+
+def _forget_short_link(short_link):
+    with _lock:
+        _short_links.pop(short_link, None)
+    cache.delete(SHORT_LINK_CACHE_KEY.format(short_link))
+
+
+def _store_short_link(short_link, recipe_id):
+    with _lock:
+        _short_links.pop(short_link, None)
+    cache.set(
+        SHORT_LINK_CACHE_KEY.format(short_link),
+        recipe_id,
+        timeout=get_short_link_timeout(recipe_id),
+    )
+
+
+def clear_short_links():
+    """Очищаем LRU коротких ссылок процесса."""
+    with _lock:
+        _short_links.clear()
@@ -1,7 +1,20 @@
+import string
+
 # Максимальная длина поля названия
 MAX_LENGTH_NAME = 256
-# Максимальная длина поля ссылки
-MAX_LENGTH_LINK = 3
+# Максимальная длина поля ссылки, хватает для любого id рецепта
+MAX_LENGTH_LINK = 11
+# Символы короткой ссылки
+SHORT_LINK_ALPHABET = string.digits + string.ascii_letters
+# Длина коротких ссылок, вычисляемых по id. Старые случайные
+# ссылки короче, поэтому с новыми не совпадают.
+SHORT_LINK_MIN_LENGTH = 4
+# Множитель и сдвиг перемешивания id в короткой ссылке.
+# Множитель взаимно прост с длиной алфавита.
+SHORT_LINK_MULTIPLIER = 9576890767
+SHORT_LINK_OFFSET = 1234567
+# Количество id рецептов, резервируемых процессом одним запросом
+RECIPE_ID_BLOCK = 100
 # Максимальная длина поля тэга
 MAX_LENGTH_TAGS = 32
 # Максимальная длина поля ингридиента
@@ -12,3 +25,21 @@ MAX_LENGTH_UNIT = 64
 MIN_AMOUNT = 1
 # Максимальное количество
 MAX_AMOUNT = 32000
+# Колонка полнотекстового поиска, вычисляемая базой данных
+SEARCH_VECTOR_COLUMN = "search_vector"
+# Конфигурация полнотекстового поиска
+SEARCH_CONFIG = "russian"
+# Ключ общего кэша id рецепта по короткой ссылке
+SHORT_LINK_CACHE_KEY = "short_link:{}"
+# Значение кэша для неизвестной короткой ссылки
+SHORT_LINK_MISSING = 0
+# Время хранения неизвестной короткой ссылки в кэше, секунды
+SHORT_LINK_NEGATIVE_TIMEOUT = 60
+# Количество коротких ссылок в LRU процесса
+SHORT_LINK_LOCAL_SIZE = 10_000
+# Время хранения короткой ссылки в LRU процесса, секунды
+SHORT_LINK_LOCAL_TIMEOUT = 60
+# Параметр выбора пагинации
+PAGINATION_PARAM = "pagination"
+# Курсорная пагинация
+CURSOR_PAGINATION = "cursor"
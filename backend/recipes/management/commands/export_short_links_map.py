@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+
+# Ссылки, которые можно без экранирования записать в файл map
+SHORT_LINK_PATTERN = r"^[0-9A-Za-z]+$"
+# Количество рецептов, читаемых из базы данных за раз
+CHUNK_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    """
+    Выгружаем короткие ссылки рецептов в файл map для nginx.
+
+    Строка файла - короткая ссылка и значение из ссылки и адреса
+    рецепта. nginx отвечает редиректом на известные ссылки,
+    не обращаясь к backend. Ключи map nginx сравнивает без учета
+    регистра, поэтому ссылку из значения nginx сверяет с запрошенной,
+    а из ссылок, отличающихся только регистром, выгружаем первую.
+    Остальные обрабатывает backend.
+    Файл записываем атомарно, после выгрузки nginx нужно перезагрузить.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу map.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        directory = os.path.dirname(os.path.abspath(path))
+        links = (
+            Recipe.objects.filter(short_link__regex=SHORT_LINK_PATTERN)
+            .order_by("id")
+            .values_list("short_link", "id")
+        )
+        count = 0
+        exported = set()
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, delete=False
+        ) as temporary:
+            for short_link, recipe_id in links.iterator(chunk_size=CHUNK_SIZE):
+                if short_link.lower() in exported:
+                    continue
+                exported.add(short_link.lower())
+                temporary.write(
+                    f'{short_link} "{short_link} /recipes/{recipe_id}/";\n'
+                )
+                count += 1
+        os.chmod(temporary.name, 0o644)
+        os.replace(temporary.name, path)
+        self.stdout.write(f"Выгружено коротких ссылок: {count}.")
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingCart, ShoppingListItem
+from users.models import Subscribe, User
+
+
+def count_related(model, field):
+    """Подзапрос количества связанных объектов."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    """
+    Пересчитываем счетчики избранного, списков покупок и подписок.
+
+    Пересобираем суммарные списки покупок.
+    """
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        recipes = Recipe.objects.update(
+            favorites_count=count_related(Favorite, "recipe"),
+            shopping_carts_count=count_related(ShoppingCart, "recipe"),
+        )
+        users = User.objects.update(
+            recipes_count=count_related(Recipe, "author"),
+            subscribers_count=count_related(Subscribe, "subscription"),
+        )
+        items = ShoppingListItem.objects.rebuild()
+        self.stdout.write(
+            f"Пересчитаны счетчики рецептов: {recipes}, "
+            f"пользователей: {users}, "
+            f"ингредиентов в списках покупок: {items}."
+        )
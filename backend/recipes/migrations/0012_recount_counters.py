@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_related(model, field):
+    """Подзапрос количества связанных объектов."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def recount_counters(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    Favorite = apps.get_model("recipes", "Favorite")
+    ShoppingCart = apps.get_model("recipes", "ShoppingCart")
+    User = apps.get_model("users", "User")
+    Subscribe = apps.get_model("users", "Subscribe")
+    Recipe.objects.update(
+        favorites_count=count_related(Favorite, "recipe"),
+        shopping_carts_count=count_related(ShoppingCart, "recipe"),
+    )
+    User.objects.update(
+        recipes_count=count_related(Recipe, "author"),
+        subscribers_count=count_related(Subscribe, "subscription"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_counters'),
+        ('users', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_counters, migrations.RunPython.noop),
+    ]
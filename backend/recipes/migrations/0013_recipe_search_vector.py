@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# Вес названия выше веса описания рецепта.
+ADD_SEARCH_VECTOR = """
+ALTER TABLE recipes_recipe
+ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian', coalesce(name, '')), 'A')
+    || setweight(to_tsvector('russian', coalesce(text, '')), 'B')
+) STORED;
+CREATE INDEX recipe_search_vector_idx
+ON recipes_recipe USING GIN (search_vector);
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS recipe_search_vector_idx;
+ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_recount_counters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(ADD_SEARCH_VECTOR, DROP_SEARCH_VECTOR),
+    ]
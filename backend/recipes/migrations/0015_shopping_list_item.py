@@ -0,0 +1,44 @@
+# Generated by Django 4.2.15 on 2026-10-18 05:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Заполняем списки покупок по содержимому корзин.
+FILL_SHOPPING_LISTS = """
+INSERT INTO recipes_shoppinglistitem (user_id, ingredient_id, amount)
+SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount)
+FROM recipes_shoppingcart cart
+JOIN recipes_recipeingredient ri ON ri.recipe_id = cart.recipe_id
+GROUP BY cart.user_id, ri.ingredient_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0014_ingredient_name_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingListItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField(verbose_name='Количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.ingredient', verbose_name='Ингридиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list_items', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Ингредиент списка покупок',
+                'verbose_name_plural': 'Ингредиенты списков покупок',
+                'ordering': ['user'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoppinglistitem',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_shopping_list_item'),
+        ),
+        migrations.RunSQL(FILL_SHOPPING_LISTS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.15 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+# Удаляем повторные записи избранного и списка покупок,
+# затем пересчитываем счетчики рецептов и суммарные списки покупок.
+REMOVE_DUPLICATES = """
+DELETE FROM recipes_favorite a USING recipes_favorite b
+WHERE a.id > b.id AND a.user_id = b.user_id AND a.recipe_id = b.recipe_id;
+DELETE FROM recipes_shoppingcart a USING recipes_shoppingcart b
+WHERE a.id > b.id AND a.user_id = b.user_id AND a.recipe_id = b.recipe_id;
+UPDATE recipes_recipe recipe SET
+favorites_count = (
+    SELECT COUNT(*) FROM recipes_favorite f WHERE f.recipe_id = recipe.id
+),
+shopping_carts_count = (
+    SELECT COUNT(*) FROM recipes_shoppingcart c WHERE c.recipe_id = recipe.id
+);
+DELETE FROM recipes_shoppinglistitem;
+INSERT INTO recipes_shoppinglistitem (user_id, ingredient_id, amount)
+SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount)
+FROM recipes_shoppingcart cart
+JOIN recipes_recipeingredient ri ON ri.recipe_id = cart.recipe_id
+GROUP BY cart.user_id, ri.ingredient_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_shopping_list_item'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REMOVE_DUPLICATES, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_favorite'),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcart',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_shoppingcart'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.15 on 2026-10-18 06:25
+
+import string
+
+from django.db import migrations, models
+
+# Размер пачки обновления рецептов
+BATCH_SIZE = 1000
+# Копия параметров recipes.shortlinks на момент миграции:
+# уже выданные ссылки не должны меняться вместе с кодом.
+SHORT_LINK_ALPHABET = string.digits + string.ascii_letters
+SHORT_LINK_MIN_LENGTH = 4
+SHORT_LINK_MULTIPLIER = 9576890767
+SHORT_LINK_OFFSET = 1234567
+BASE = len(SHORT_LINK_ALPHABET)
+
+
+def encode_short_link(number):
+    """Копия recipes.shortlinks.encode_short_link на момент миграции."""
+    position = number - 1
+    length = SHORT_LINK_MIN_LENGTH
+    while position >= BASE**length:
+        position -= BASE**length
+        length += 1
+    value = (position * SHORT_LINK_MULTIPLIER + SHORT_LINK_OFFSET) % (
+        BASE**length
+    )
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, BASE)
+        chars.append(SHORT_LINK_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def fill_short_links(apps, schema_editor):
+    """Заполняем короткие ссылки рецептов, у которых их нет."""
+    Recipe = apps.get_model("recipes", "Recipe")
+    recipes = Recipe.objects.filter(short_link__isnull=True).only("id")
+    batch = []
+    for recipe in recipes.iterator(chunk_size=BATCH_SIZE):
+        recipe.short_link = encode_short_link(recipe.id)
+        batch.append(recipe)
+        if len(batch) == BATCH_SIZE:
+            Recipe.objects.bulk_update(batch, ["short_link"])
+            batch = []
+    Recipe.objects.bulk_update(batch, ["short_link"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_unique_shopping_cart_favorite'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='short_link',
+            field=models.CharField(blank=True, max_length=11, null=True, unique=True, verbose_name='Короткая ссылка'),
+        ),
+        migrations.RunPython(fill_short_links, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,7 @@
-import random
-import string
-
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import connection, models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Greatest, Upper
 
 from recipes.constants import (
     MAX_LENGTH_INGREDIENT,
@@ -9,10 +9,30 @@ from recipes.constants import (
     MAX_LENGTH_NAME,
     MAX_LENGTH_TAGS,
     MAX_LENGTH_UNIT,
+    RECIPE_ID_BLOCK,
 )
+from recipes.shortlinks import IdBlockAllocator, encode_short_link
 from recipes.validators import amount_validator
 from users.models import User
 
+# Id новых рецептов, зарезервированные процессом
+recipe_ids = IdBlockAllocator(RECIPE_ID_BLOCK)
+
+
+class RecipeManager(models.Manager):
+    """Менеджер рецептов."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Назначаем новым рецептам id и короткие ссылки до вставки."""
+        objs = list(objs)
+        new = [recipe for recipe in objs if recipe.pk is None]
+        for recipe, pk in zip(new, recipe_ids.allocate(self.model, len(new))):
+            recipe.pk = pk
+        for recipe in objs:
+            if not recipe.short_link:
+                recipe.short_link = encode_short_link(recipe.pk)
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class Recipe(models.Model):
     """Модель рецепта."""
@@ -51,28 +71,39 @@ class Recipe(models.Model):
         max_length=MAX_LENGTH_LINK, unique=True,
         blank=True, null=True, verbose_name="Короткая ссылка"
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Добавлено в избранное"
+    )
+    shopping_carts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Добавлено в списки покупок"
+    )
+
+    objects = RecipeManager()
 
     class Meta:
         ordering = ["-pub_date"]
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"], name="recipe_pub_date_id_idx"
+            )
+        ]
 
     def save(self, *args, **kwargs):
+        """
+        Сохраняем рецепт.
+
+        Id нового рецепта берем из зарезервированного блока,
+        чтобы записать короткую ссылку в том же INSERT.
+        """
+        if self.pk is None:
+            self.pk = recipe_ids.allocate(Recipe, 1)[0]
+            kwargs["force_insert"] = True
         if not self.short_link:
-            self.short_link = self.generate_short_link()
+            self.short_link = encode_short_link(self.pk)
         super().save(*args, **kwargs)
 
-    def generate_short_link(self):
-        """Генерирует уникальную короткую ссылку для рецепта."""
-        length = MAX_LENGTH_LINK
-        characters = string.ascii_letters + string.digits
-        while True:
-            short_link = "".join(
-                random.choice(characters) for _ in range(length)
-            )
-            if not Recipe.objects.filter(short_link=short_link).exists():
-                return short_link
-
     def __str__(self):
         return self.name
 
@@ -110,6 +141,13 @@ class Ingredient(models.Model):
         ordering = ["name"]
         verbose_name = "Ингридиент"
         verbose_name_plural = "Ингридиенты"
+        # Поиск по названию без учета регистра сравнивает UPPER(name).
+        indexes = [
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="ingredient_name_trgm_idx",
+            )
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.measurement_unit}"
@@ -161,15 +199,55 @@ class RecipeTag(models.Model):
         return f"{self.recipe} {self.tags}"
 
 
+class ShoppingCartFavoriteManager(models.Manager):
+    """Менеджер списка покупок и избранного."""
+
+    def add_recipes(self, user, recipe_ids):
+        """
+        Добавляем рецепты пользователю одним запросом.
+
+        Несуществующие и уже добавленные рецепты пропускаем,
+        возвращаем id действительно добавленных рецептов.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.model._meta.db_table} "
+                f"(user_id, recipe_id) "
+                f"SELECT %s, recipe.id FROM {Recipe._meta.db_table} recipe "
+                f"WHERE recipe.id = ANY(%s::bigint[]) "
+                f"ON CONFLICT (user_id, recipe_id) DO NOTHING "
+                f"RETURNING recipe_id",
+                [user.pk, list(recipe_ids)],
+            )
+            return {recipe_id for recipe_id, in cursor.fetchall()}
+
+    def remove_recipes(self, user, recipe_ids):
+        """
+        Удаляем рецепты пользователя одним запросом.
+
+        Возвращаем id действительно удаленных рецептов.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.model._meta.db_table} "
+                f"WHERE user_id = %s AND recipe_id = ANY(%s::bigint[]) "
+                f"RETURNING recipe_id",
+                [user.pk, list(recipe_ids)],
+            )
+            return {recipe_id for recipe_id, in cursor.fetchall()}
+
+
 class ShoppingCartFavoriteBaseModel(models.Model):
     """Базовый класс моделей списка покупок и избранного."""
 
+    objects = ShoppingCartFavoriteManager()
+
     class Meta:
         ordering = ["recipe"]
         abstract = True
         constraints = [
             models.UniqueConstraint(
-                fields=["user", "recipe"], name="unique_shopping_cart"
+                fields=["user", "recipe"], name="unique_%(class)s"
             )
         ]
 
@@ -187,7 +265,7 @@ class ShoppingCart(ShoppingCartFavoriteBaseModel):
         Recipe, on_delete=models.CASCADE, related_name="is_in_shopping_cart"
     )
 
-    class Meta:
+    class Meta(ShoppingCartFavoriteBaseModel.Meta):
         ordering = ["user"]
         verbose_name = "Список покупок"
         verbose_name_plural = "Списки покупок"
@@ -206,7 +284,126 @@ class Favorite(ShoppingCartFavoriteBaseModel):
         Recipe, on_delete=models.CASCADE, related_name="is_favorite"
     )
 
-    class Meta:
+    class Meta(ShoppingCartFavoriteBaseModel.Meta):
         ordering = ["user"]
         verbose_name = "Избранное"
         verbose_name_plural = "Избранные"
+
+
+class ShoppingListItemManager(models.Manager):
+    """
+    Менеджер суммарного списка покупок.
+
+    Методы вызываются в одной транзакции с изменением
+    списка покупок или ингредиентов рецепта.
+    """
+
+    def add_recipe(self, recipe):
+        """Добавляем ингредиенты рецепта во все списки, где есть рецепт."""
+        item_table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {item_table} (user_id, ingredient_id, amount) "
+                f"SELECT cart.user_id, ri.ingredient_id, ri.amount "
+                f"FROM {ShoppingCart._meta.db_table} cart "
+                f"JOIN {RecipeIngredient._meta.db_table} ri "
+                f"ON ri.recipe_id = cart.recipe_id "
+                f"WHERE cart.recipe_id = %s "
+                f"ON CONFLICT (user_id, ingredient_id) DO UPDATE "
+                f"SET amount = {item_table}.amount + EXCLUDED.amount",
+                [recipe.pk],
+            )
+
+    def add_user_recipes(self, user, recipe_ids):
+        """Добавляем ингредиенты рецептов в список покупок пользователя."""
+        item_table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {item_table} (user_id, ingredient_id, amount) "
+                f"SELECT %s, ri.ingredient_id, SUM(ri.amount) "
+                f"FROM {RecipeIngredient._meta.db_table} ri "
+                f"WHERE ri.recipe_id = ANY(%s::bigint[]) "
+                f"GROUP BY ri.ingredient_id "
+                f"ON CONFLICT (user_id, ingredient_id) DO UPDATE "
+                f"SET amount = {item_table}.amount + EXCLUDED.amount",
+                [user.pk, list(recipe_ids)],
+            )
+
+    def remove_recipe(self, recipe):
+        """Вычитаем ингредиенты рецепта из всех списков, где есть рецепт."""
+        self.subtract(
+            ShoppingCart.objects.filter(recipe=recipe).values("user"),
+            RecipeIngredient.objects.filter(recipe=recipe),
+        )
+
+    def remove_user_recipes(self, user, recipe_ids):
+        """Вычитаем ингредиенты рецептов из списка покупок пользователя."""
+        self.subtract(
+            [user.pk], RecipeIngredient.objects.filter(recipe__in=recipe_ids)
+        )
+
+    def subtract(self, users, recipe_ingredients):
+        """
+        Вычитаем ингредиенты из списков покупок пользователей.
+
+        Ингредиенты с нулевым количеством удаляем.
+        """
+        items = self.filter(
+            user__in=users,
+            ingredient__in=recipe_ingredients.values("ingredient"),
+        )
+        totals = (
+            recipe_ingredients.filter(ingredient=OuterRef("ingredient"))
+            .order_by()
+            .values("ingredient")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        )
+        items.update(amount=Greatest(F("amount") - Subquery(totals), 0))
+        items.filter(amount=0).delete()
+
+    def rebuild(self):
+        """Пересобираем все списки покупок по содержимому корзин."""
+        self.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.model._meta.db_table} "
+                f"(user_id, ingredient_id, amount) "
+                f"SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount) "
+                f"FROM {ShoppingCart._meta.db_table} cart "
+                f"JOIN {RecipeIngredient._meta.db_table} ri "
+                f"ON ri.recipe_id = cart.recipe_id "
+                f"GROUP BY cart.user_id, ri.ingredient_id"
+            )
+            return cursor.rowcount
+
+
+class ShoppingListItem(models.Model):
+    """Модель суммарного количества ингредиента в списке покупок."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_list_items",
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, verbose_name="Ингридиент"
+    )
+    amount = models.PositiveIntegerField(verbose_name="Количество")
+
+    objects = ShoppingListItemManager()
+
+    class Meta:
+        ordering = ["user"]
+        verbose_name = "Ингредиент списка покупок"
+        verbose_name_plural = "Ингредиенты списков покупок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"],
+                name="unique_shopping_list_item",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.ingredient} - {self.amount}"
@@ -1,4 +1,16 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.utils.urls import remove_query_param
+
+from recipes.constants import CURSOR_PAGINATION, PAGINATION_PARAM
 
 
 class LimitPageNumberPagination(PageNumberPagination):
@@ -9,3 +21,141 @@ class LimitPageNumberPagination(PageNumberPagination):
 class RecipeLimitPageNumberPagination(PageNumberPagination):
     page_size_query_param = "recipe_limit"
     max_page_size = 100
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по уникальному набору полей сортировки.
+
+    Курсор хранит значения всех полей ordering последнего объекта,
+    поэтому страница выбирается условием по ключу без OFFSET и COUNT.
+    """
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = self.get_keyset_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            position = self.parse_position(queryset.model, self.cursor)
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, position)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_keyset_ordering(self, reverse):
+        """Получаем сортировку с учетом направления обхода."""
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def get_keyset_filter(self, ordering, position):
+        """Условие для объектов, следующих за позицией курсора."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def parse_position(self, model, cursor):
+        """Приводим значения позиции курсора к типам полей модели."""
+        try:
+            values = json.loads(cursor.position)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_position(self, instance):
+        """Получаем позицию курсора для объекта."""
+        return json.dumps(
+            [str(getattr(instance, field.lstrip("-")))
+             for field in self.ordering]
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=False,
+                position=self.get_position(self.page[-1]),
+            )
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = (
+            self.get_position(self.page[0])
+            if self.page
+            else self.cursor.position
+        )
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+
+class RecipeCursorPagination(KeysetCursorPagination):
+    """Курсорная пагинация рецептов по дате публикации и id."""
+
+    ordering = ("-pub_date", "-id")
+
+
+class SubscriptionCursorPagination(KeysetCursorPagination):
+    """Курсорная пагинация подписок по id подписки."""
+
+    ordering = ("id",)
+
+
+class CursorPaginationMixin:
+    """
+    Включаем курсорную пагинацию по параметру запроса pagination=cursor.
+
+    Без параметра используется пагинация вьюсета по умолчанию.
+    """
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.request.query_params.get(PAGINATION_PARAM)
+            == CURSOR_PAGINATION
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
@@ -0,0 +1,103 @@
+import os
+import threading
+
+from django.db import connection
+
+from recipes.constants import (
+    MAX_LENGTH_LINK,
+    SHORT_LINK_ALPHABET,
+    SHORT_LINK_MIN_LENGTH,
+    SHORT_LINK_MULTIPLIER,
+    SHORT_LINK_OFFSET,
+)
+
+BASE = len(SHORT_LINK_ALPHABET)
+DIGITS = {char: value for value, char in enumerate(SHORT_LINK_ALPHABET)}
+
+
+def encode_short_link(number):
+    """
+    Получаем короткую ссылку по id рецепта.
+
+    Id нумеруем по группам одинаковой длины ссылки, внутри группы
+    перемешиваем взаимно однозначным аффинным преобразованием
+    по модулю BASE ** length. Разным id соответствуют разные ссылки,
+    а ссылки короче SHORT_LINK_MIN_LENGTH остаются старым случайным.
+    """
+    position = number - 1
+    length = SHORT_LINK_MIN_LENGTH
+    while position >= BASE**length:
+        position -= BASE**length
+        length += 1
+    value = (position * SHORT_LINK_MULTIPLIER + SHORT_LINK_OFFSET) % (
+        BASE**length
+    )
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, BASE)
+        chars.append(SHORT_LINK_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def decode_short_link(short_link):
+    """
+    Получаем id рецепта по короткой ссылке.
+
+    Для старых случайных и некорректных ссылок возвращаем None.
+    """
+    length = len(short_link)
+    if not SHORT_LINK_MIN_LENGTH <= length <= MAX_LENGTH_LINK:
+        return None
+    value = 0
+    for char in short_link:
+        if char not in DIGITS:
+            return None
+        value = value * BASE + DIGITS[char]
+    modulus = BASE**length
+    position = (
+        (value - SHORT_LINK_OFFSET) * pow(SHORT_LINK_MULTIPLIER, -1, modulus)
+    ) % modulus
+    return position + 1 + sum(
+        BASE**shorter for shorter in range(SHORT_LINK_MIN_LENGTH, length)
+    )
+
+
+class IdBlockAllocator:
+    """
+    Выдает id из последовательности таблицы блоками.
+
+    Каждый процесс резервирует блок id одним запросом,
+    поэтому id известен до вставки записи.
+    """
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.ids = []
+        self.pid = None
+
+    def allocate(self, model, count):
+        """Выдаем count id для новых записей модели."""
+        with self.lock:
+            if self.pid != os.getpid():
+                # Дочерний процесс не должен выдавать id родителя.
+                self.ids = []
+                self.pid = os.getpid()
+            missing = count - len(self.ids)
+            if missing > 0:
+                self.ids.extend(
+                    self.fetch(model, missing + self.block_size)
+                )
+            ids = self.ids[:count]
+            del self.ids[:count]
+            return ids
+
+    def fetch(self, model, count):
+        """Получаем id из последовательности одним запросом."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+                "FROM generate_series(1, %s)",
+                [model._meta.db_table, model._meta.pk.column, count],
+            )
+            return sorted(value for value, in cursor.fetchall())
@@ -1,10 +1,11 @@
-from django.urls import path
+from django.urls import re_path
 
+from recipes.constants import MAX_LENGTH_LINK
 from recipes.views import RedirectToRecipeView
 
 urlpatterns = [
-    path(
-        "<str:short_link>/",
+    re_path(
+        rf"^(?P<short_link>[0-9A-Za-z]{{1,{MAX_LENGTH_LINK}}})/$",
         RedirectToRecipeView.as_view(),
         name="short_link_redirect",
     ),
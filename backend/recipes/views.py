@@ -1,12 +1,15 @@
-from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404
+from django.shortcuts import redirect
 from django.views import View
 
-from recipes.models import Recipe
+from recipes.cache import resolve_short_link
 
 
 class RedirectToRecipeView(View):
     """Вью для редиректа по короткой ссылке."""
 
     def get(self, request, short_link):
-        recipe = get_object_or_404(Recipe, short_link=short_link)
-        return redirect(f"/recipes/{recipe.id}/")
+        recipe_id = resolve_short_link(short_link)
+        if recipe_id is None:
+            raise Http404("Рецепт не найден.")
+        return redirect(f"/recipes/{recipe_id}/")
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from tests.constants import (
     CURRENT_PASSWORD,
@@ -11,9 +12,24 @@ from tests.constants import (
     USER_URL,
 )
 
+from recipes.cache import clear_short_links
 from recipes.models import Ingredient, Recipe, Tag, User
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очищаем кэш перед каждым тестом."""
+    cache.clear()
+    clear_short_links()
+
+
+@pytest.fixture(autouse=True)
+def document_cache_dir(settings, tmp_path):
+    """Храним кэш документов во временной папке теста."""
+    settings.DOCUMENT_CACHE_DIR = str(tmp_path / "documents")
+    return tmp_path / "documents"
+
+
 @pytest.fixture()
 def unauthorized_client():
     """
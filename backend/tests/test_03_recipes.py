@@ -1,12 +1,26 @@
+import io
+
 import pytest
+from django.core.cache import cache
+from django.core.management import call_command
 from tests.constants import FORMAT, RECIPE_URL, RECIPES_COUNT
 
-from recipes.models import Recipe
+from api.cache import get_cached_recipes, invalidate_recipes
+from recipes.cache import clear_short_links, resolve_short_link
+from recipes.constants import SHORT_LINK_CACHE_KEY, SHORT_LINK_MISSING
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.shortlinks import decode_short_link
 
 
 @pytest.mark.django_db
 class TestRecipe:
     FILTER_RESULT = 1
+    MANY_RECIPES_COUNT = 100
+    # Токен, количество, рецепты, авторы, тэги, ингредиенты.
+    LIST_QUERIES_COUNT = 6
+    # Токен, количество, рецепты.
+    CACHED_LIST_QUERIES_COUNT = 3
+    CARD_FIELDS = {"id", "name", "image", "cooking_time"}
 
     @pytest.fixture(autouse=True)
     def setup_authenticated_client(self, authenticated_client):
@@ -212,3 +226,402 @@ class TestRecipe:
         assert response.status_code == 200
         assert len(response.data["results"]) == self.FILTER_RESULT
         assert response.data["results"][0]["id"] == first_recipe_id
+
+    def test_17_list_is_favorited_and_in_shopping_cart(
+        self, create_favorite, create_shopping_cart, first_recipe_id
+    ):
+        """
+        Проверяем флаги избранного и списка покупок
+        в списке рецептов.
+        """
+        response = self.second_authenticated_client.get(RECIPE_URL)
+        assert response.status_code == 200
+        for recipe in response.data["results"]:
+            is_first_recipe = recipe["id"] == first_recipe_id
+            assert recipe["is_favorited"] is is_first_recipe
+            assert recipe["is_in_shopping_cart"] is is_first_recipe
+
+    @pytest.fixture
+    def create_many_recipes(
+        self, create_ingredients, create_tags, setup_authenticated_client
+    ):
+        """Создаем много рецептов с тэгами и ингредиентами."""
+        author = User.objects.get(
+            email=self.authenticated_data["email"]
+        )
+        for number in range(self.MANY_RECIPES_COUNT):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f"recipe{number}",
+                text="text",
+                cooking_time=1,
+            )
+            recipe.tags.set(create_tags)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+                for ingredient in create_ingredients
+            )
+
+    @pytest.mark.parametrize("limit", (1, 10, 100))
+    def test_18_list_queries_count(
+        self, create_many_recipes, django_assert_num_queries, limit
+    ):
+        """
+        Проверяем, что количество запросов к базе
+        не зависит от размера страницы.
+        """
+        with django_assert_num_queries(self.LIST_QUERIES_COUNT):
+            response = self.second_authenticated_client.get(
+                f"{RECIPE_URL}?limit={limit}"
+            )
+        assert response.status_code == 200
+        assert len(response.data["results"]) == limit
+
+    def test_19_get_recipe_queries_count(
+        self, create_many_recipes, django_assert_num_queries
+    ):
+        """Проверяем количество запросов при получении рецепта."""
+        recipe_id = Recipe.objects.latest("id").id
+        with django_assert_num_queries(self.LIST_QUERIES_COUNT - 1):
+            response = self.second_authenticated_client.get(
+                f"{RECIPE_URL}{recipe_id}/"
+            )
+        assert response.status_code == 200
+
+    def test_20_cursor_pagination(self, create_many_recipes):
+        """Проверяем обход рецептов курсорной пагинацией."""
+        expected_ids = list(
+            Recipe.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        url = f"{RECIPE_URL}?pagination=cursor&limit=30"
+        pages = []
+        while url:
+            response = self.second_authenticated_client.get(url)
+            assert response.status_code == 200
+            assert "count" not in response.data
+            pages.append(response.data)
+            url = response.data["next"]
+        received_ids = [
+            recipe["id"] for page in pages for recipe in page["results"]
+        ]
+        assert received_ids == expected_ids
+        assert pages[0]["previous"] is None
+
+        response = self.second_authenticated_client.get(pages[1]["previous"])
+        assert response.status_code == 200
+        assert response.data["results"] == pages[0]["results"]
+
+    def test_21_cursor_pagination_invalid_cursor(self, create_recipes):
+        """Проверяем ответ на некорректный курсор."""
+        response = self.second_authenticated_client.get(
+            f"{RECIPE_URL}?pagination=cursor&cursor=invalid"
+        )
+        assert response.status_code == 404
+
+    def test_22_filter_by_any_tags(self, create_recipes):
+        """Проверяем фильтрацию рецептов по любому из тэгов."""
+        response = self.second_authenticated_client.get(
+            f"{RECIPE_URL}?tags=tag01&tags=tag02&tags=tag03"
+        )
+        assert response.status_code == 200
+        assert len(response.data["results"]) == RECIPES_COUNT
+
+    def test_23_filter_by_all_tags(self, create_recipes, first_recipe_id):
+        """Проверяем фильтрацию рецептов по всем тэгам."""
+        response = self.second_authenticated_client.get(
+            f"{RECIPE_URL}?tags=tag01&tags=tag02&tags_match=all"
+        )
+        assert response.status_code == 200
+        assert len(response.data["results"]) == self.FILTER_RESULT
+        assert response.data["results"][0]["id"] == first_recipe_id
+
+        response = self.second_authenticated_client.get(
+            f"{RECIPE_URL}?tags=tag01&tags=tag03&tags_match=all"
+        )
+        assert response.status_code == 200
+        assert response.data["results"] == []
+
+    def test_24_cached_list_queries_count(
+        self, create_many_recipes, django_assert_num_queries
+    ):
+        """
+        Проверяем, что закэшированные рецепты
+        не подгружают связанные объекты.
+        """
+        url = f"{RECIPE_URL}?limit=10"
+        first_response = self.second_authenticated_client.get(url)
+        with django_assert_num_queries(self.CACHED_LIST_QUERIES_COUNT):
+            response = self.second_authenticated_client.get(url)
+        assert response.data == first_response.data
+
+    def test_25_cache_invalidated_on_update(self, create_recipe, update_data):
+        """Проверяем сброс кэша рецепта после обновления."""
+        recipe_id = create_recipe.data["id"]
+        url = f"{RECIPE_URL}{recipe_id}/"
+        self.second_authenticated_client.get(url)
+        self.authenticated_client.patch(url, update_data, format="json")
+        response = self.second_authenticated_client.get(url)
+        assert response.data["name"] == update_data["name"]
+        assert response.data["tags"][0]["id"] == update_data["tags"][0]
+        assert len(response.data["tags"]) == len(update_data["tags"])
+
+    def test_26_cached_recipe_user_flags(
+        self, create_favorite, first_recipe_id
+    ):
+        """
+        Проверяем, что данные пользователя
+        не попадают в общий кэш рецепта.
+        """
+        url = f"{RECIPE_URL}{first_recipe_id}/"
+        response = self.second_authenticated_client.get(url)
+        assert response.data["is_favorited"] is True
+        response = self.authenticated_client.get(url)
+        assert response.data["is_favorited"] is False
+        assert response.data["image"].startswith("http://testserver/")
+
+    def test_27_not_modified_recipe(self, create_recipes, first_recipe_id):
+        """Проверяем условный запрос рецепта."""
+        url = f"{RECIPE_URL}{first_recipe_id}/"
+        response = self.second_authenticated_client.get(url)
+        etag = response["ETag"]
+        response = self.second_authenticated_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+
+        self.second_authenticated_client.post(f"{url}favorite/")
+        response = self.second_authenticated_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert response.data["is_favorited"] is True
+
+    def test_28_sparse_fields(
+        self, create_many_recipes, django_assert_num_queries
+    ):
+        """
+        Проверяем выдачу только запрошенных полей
+        без подгрузки связанных объектов.
+        """
+        with django_assert_num_queries(self.CACHED_LIST_QUERIES_COUNT):
+            response = self.second_authenticated_client.get(
+                f"{RECIPE_URL}?fields=name,image,cooking_time&limit=10"
+            )
+        assert response.status_code == 200
+        for recipe in response.data["results"]:
+            assert set(recipe) == self.CARD_FIELDS
+
+    def test_29_omit_fields(self, create_recipes):
+        """Проверяем исключение полей из выдачи."""
+        response = self.second_authenticated_client.get(
+            f"{RECIPE_URL}?omit=text,ingredients"
+        )
+        assert response.status_code == 200
+        for recipe in response.data["results"]:
+            assert "text" not in recipe
+            assert "ingredients" not in recipe
+            assert recipe["author"]["is_subscribed"] is False
+            assert recipe["tags"]
+
+    def test_30_batch_recipes(self, create_recipes, second_recipe_id):
+        """Проверяем получение рецептов по списку id."""
+        missing_id = second_recipe_id + 1
+        response = self.second_authenticated_client.get(
+            f"{RECIPE_URL}batch/?ids={second_recipe_id},{missing_id},"
+            f"{second_recipe_id - 1}"
+        )
+        assert response.status_code == 200
+        assert [recipe["id"] for recipe in response.data["results"]] == [
+            second_recipe_id, second_recipe_id - 1
+        ]
+        assert response.data["missing"] == [missing_id]
+
+    def test_31_batch_recipes_limit(self, client):
+        """Проверяем ограничение количества id и их формат."""
+        ids = ",".join(str(number) for number in range(1, 102))
+        response = client.get(f"{RECIPE_URL}batch/?ids={ids}")
+        assert response.status_code == 400
+        response = client.get(f"{RECIPE_URL}batch/?ids=1,a")
+        assert response.status_code == 400
+
+    def test_32_search_recipes(self, setup_authenticated_client):
+        """
+        Проверяем полнотекстовый поиск рецептов:
+        совпадение в названии выше совпадения в описании.
+        """
+        author = User.objects.get(email=self.authenticated_data["email"])
+        in_text = Recipe.objects.create(
+            author=author,
+            name="Салат",
+            text="Подавать перед борщом",
+            cooking_time=1,
+        )
+        in_name = Recipe.objects.create(
+            author=author, name="Борщ", text="Суп со свеклой", cooking_time=1
+        )
+        Recipe.objects.create(
+            author=author, name="Омлет", text="Яйца", cooking_time=1
+        )
+        response = self.second_authenticated_client.get(
+            RECIPE_URL, {"search": "борщ"}
+        )
+        assert response.status_code == 200
+        assert [recipe["id"] for recipe in response.data["results"]] == [
+            in_name.id, in_text.id
+        ]
+
+    def test_33_short_link_allocation(
+        self, setup_authenticated_client, client, django_assert_num_queries
+    ):
+        """
+        Проверяем, что короткая ссылка вычисляется по id
+        без дополнительных запросов и не совпадает со старыми.
+        """
+        author = User.objects.get(email=self.authenticated_data["email"])
+        legacy = Recipe.objects.create(
+            author=author,
+            name="legacy",
+            text="text",
+            cooking_time=1,
+            short_link="abc",
+        )
+        # Вставка рецепта и счетчик рецептов автора.
+        with django_assert_num_queries(2):
+            recipe = Recipe.objects.create(
+                author=author, name="new", text="text", cooking_time=1
+            )
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author=author,
+                name=f"bulk_{number}",
+                text="text",
+                cooking_time=1,
+            )
+            for number in range(3)
+        )
+        links = {legacy.short_link}
+        for created in [recipe, *recipes]:
+            created.refresh_from_db()
+            assert decode_short_link(created.short_link) == created.id
+            links.add(created.short_link)
+        assert len(links) == 5
+        for created in (legacy, recipe):
+            response = client.get(f"/s/{created.short_link}/")
+            assert response.status_code == 302
+            assert response["Location"] == f"/recipes/{created.id}/"
+
+    def test_34_cached_short_link_redirect(
+        self, create_recipe, client, django_assert_num_queries
+    ):
+        """
+        Проверяем, что повторные переходы по короткой ссылке
+        и по неизвестной ссылке не обращаются к базе данных.
+        """
+        recipe = Recipe.objects.get(id=create_recipe.data["id"])
+        url = f"/s/{recipe.short_link}/"
+        assert client.get(url).status_code == 302
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response["Location"] == f"/recipes/{recipe.id}/"
+
+        assert client.get("/s/zzzzzz/").status_code == 404
+        with django_assert_num_queries(0):
+            assert client.get("/s/zzzzzz/").status_code == 404
+
+        self.authenticated_client.delete(f"{RECIPE_URL}{recipe.id}/")
+        assert client.get(url).status_code == 404
+
+    def test_35_export_short_links_map(self, create_recipe, tmp_path):
+        """Проверяем выгрузку коротких ссылок в файл map для nginx."""
+        recipe = Recipe.objects.get(id=create_recipe.data["id"])
+        path = tmp_path / "short_links.map"
+        call_command("export_short_links_map", str(path), stdout=io.StringIO())
+        link = recipe.short_link
+        assert path.read_text() == (
+            f'{link} "{link} /recipes/{recipe.id}/";\n'
+        )
+
+    def test_36_stale_recipe_not_cached(self, create_recipe):
+        """
+        Проверяем, что представление, построенное до изменения рецепта
+        и сохраненное после сброса кэша, не выдается.
+        """
+        recipe = Recipe.objects.get(id=create_recipe.data["id"])
+        invalidate_recipes([recipe.id])
+
+        def serialize_before_update(recipes):
+            stale = [{"name": item.name} for item in recipes]
+            invalidate_recipes([recipe.id])
+            return stale
+
+        assert get_cached_recipes([recipe], serialize_before_update) == [
+            {"name": recipe.name}
+        ]
+        assert get_cached_recipes(
+            [recipe], lambda recipes: [{"name": "fresh"}]
+        ) == [{"name": "fresh"}]
+
+    def test_37_recipes_count_outside_api(self, create_recipe):
+        """
+        Проверяем счетчик рецептов автора для рецепта,
+        созданного вне API и удаленного через API.
+        """
+        author = User.objects.get(email=self.authenticated_data["email"])
+        recipe = Recipe.objects.create(
+            author=author, name="admin_recipe", text="text", cooking_time=1
+        )
+        author.refresh_from_db()
+        assert author.recipes_count == 2
+
+        User.objects.filter(pk=author.pk).update(recipes_count=0)
+        response = self.authenticated_client.delete(
+            f"{RECIPE_URL}{recipe.id}/"
+        )
+        assert response.status_code == 204
+        author.refresh_from_db()
+        assert author.recipes_count == 0
+
+    def test_38_short_link_negative_cache_race(
+        self, create_recipe, django_capture_on_commit_callbacks
+    ):
+        """
+        Проверяем, что отметка неизвестной ссылки, записанная
+        до коммита создания рецепта, перезаписывается после коммита.
+        """
+        author = User.objects.get(email=self.authenticated_data["email"])
+        with django_capture_on_commit_callbacks() as callbacks:
+            recipe = Recipe.objects.create(
+                author=author, name="new", text="text", cooking_time=1
+            )
+        key = SHORT_LINK_CACHE_KEY.format(recipe.short_link)
+        assert cache.add(key, SHORT_LINK_MISSING)
+        for callback in callbacks:
+            callback()
+        assert not cache.add(key, SHORT_LINK_MISSING)
+        clear_short_links()
+        assert resolve_short_link(recipe.short_link) == recipe.id
+
+    def test_39_export_case_variant_short_links(self, tmp_path):
+        """
+        Проверяем, что из ссылок, отличающихся только регистром,
+        в файл map выгружается первая.
+        """
+        author = User.objects.get(email=self.authenticated_data["email"])
+        first, second = (
+            Recipe.objects.create(
+                author=author,
+                name=short_link,
+                text="text",
+                cooking_time=1,
+                short_link=short_link,
+            )
+            for short_link in ("aB12", "Ab12")
+        )
+        path = tmp_path / "short_links.map"
+        call_command("export_short_links_map", str(path), stdout=io.StringIO())
+        assert path.read_text() == f'aB12 "aB12 /recipes/{first.id}/";\n'
+        assert resolve_short_link(second.short_link) == second.id
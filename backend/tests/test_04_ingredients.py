@@ -40,3 +40,75 @@ class TestIngredient:
         assert len(results) == self.COUNT_ING_NAME_OBJECTS
         assert results[0]["name"].startswith(search_term)
         assert results[1]["name"].startswith(search_term)
+
+    def test_04_not_modified_ingredients(self, client):
+        """
+        Проверяем ответ 304 на запрос с If-None-Match
+        и новый ETag после изменения справочника.
+        """
+        response = client.get(self.INGREDIENT_URL)
+        etag = response["ETag"]
+        assert "Last-Modified" not in response
+        response = client.get(self.INGREDIENT_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        Ingredient.objects.create(
+            name="new_ingredient", measurement_unit="measurement_unit04"
+        )
+        response = client.get(self.INGREDIENT_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_05_search_ingredient_prefix_first(self, client):
+        """Проверяем, что совпадения с начала названия идут первыми."""
+        Ingredient.objects.create(
+            name="a_ingredient", measurement_unit="measurement_unit04"
+        )
+        response = client.get(self.INGREDIENT_URL, {"name": "INGREDIENT"})
+        assert response.status_code == 200
+        assert [ingredient["name"] for ingredient in response.data] == [
+            "ingredient01",
+            "ingredient02",
+            "a_ingredient",
+            "other_ingredient",
+        ]
+
+    def test_06_limit_ingredients(self, client):
+        """Проверяем ограничение количества ингредиентов в ответе."""
+        response = client.get(
+            self.INGREDIENT_URL, {"name": "ingredient", "limit": 1}
+        )
+        assert response.status_code == 200
+        assert [ingredient["name"] for ingredient in response.data] == [
+            "ingredient01"
+        ]
+        response = client.get(self.INGREDIENT_URL, {"limit": 0})
+        assert response.status_code == 400
+        assert "limit" in response.data
+
+    def test_07_search_ingredient_from_index(
+        self, client, django_assert_num_queries
+    ):
+        """Проверяем поиск по названию без запросов к базе данных."""
+        params = {"name": "INGREDIENT", "limit": 2}
+        response = client.get(self.INGREDIENT_URL, params)
+        assert [ingredient["name"] for ingredient in response.data] == [
+            "ingredient01",
+            "ingredient02",
+        ]
+        with django_assert_num_queries(0):
+            response = client.get(self.INGREDIENT_URL, params)
+        assert response.status_code == 200
+        assert response.data[0] == {
+            "id": self.ingredients_data[0].id,
+            "name": "ingredient01",
+            "measurement_unit": "measurement_unit01",
+        }
+        Ingredient.objects.create(
+            name="ingredient00", measurement_unit="measurement_unit00"
+        )
+        response = client.get(self.INGREDIENT_URL, params)
+        assert [ingredient["name"] for ingredient in response.data] == [
+            "ingredient00",
+            "ingredient01",
+        ]
@@ -1,3 +1,7 @@
+import gzip
+import json
+
+import brotli
 import pytest
 
 from recipes.models import Tag
@@ -28,3 +32,54 @@ class TestTags:
         response = client.get(f"{self.TAGS_URL}{tag_id}/")
         assert response.status_code == 200
         assert "name" in response.data
+
+    def test_03_not_modified_tags(self, client):
+        """Проверяем ответ 304 на условный запрос списка тэгов."""
+        response = client.get(self.TAGS_URL)
+        etag = response["ETag"]
+        response = client.get(self.TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        Tag.objects.create(name="new_tag", slug="new_tag")
+        response = client.get(self.TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_04_compressed_tags(self, client, django_assert_num_queries):
+        """Проверяем выдачу сжатого списка тэгов из кэша."""
+        expected = client.get(self.TAGS_URL).data
+        response = client.get(self.TAGS_URL, HTTP_ACCEPT_ENCODING="gzip")
+        assert response.status_code == 200
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert json.loads(gzip.decompress(response.content)) == expected
+        etag = response["ETag"]
+        assert etag.startswith("W/")
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                self.TAGS_URL, HTTP_ACCEPT_ENCODING="gzip, deflate"
+            )
+        assert response["ETag"] == etag
+        response = client.get(
+            self.TAGS_URL,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == 304
+
+        response = client.get(self.TAGS_URL, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        assert "Content-Encoding" not in response
+
+        Tag.objects.create(name="new_tag", slug="new_tag")
+        response = client.get(self.TAGS_URL, HTTP_ACCEPT_ENCODING="gzip")
+        tags = json.loads(gzip.decompress(response.content))
+        assert len(tags) == len(expected) + 1
+
+    def test_05_brotli_tags(self, client):
+        """Проверяем выдачу списка тэгов, сжатого brotli."""
+        expected = client.get(self.TAGS_URL).data
+        response = client.get(self.TAGS_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+        assert response.status_code == 200
+        assert response["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(response.content)) == expected
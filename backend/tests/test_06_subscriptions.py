@@ -1,12 +1,20 @@
+import io
+
 import pytest
+from django.core.management import call_command
 from tests.constants import USER_URL
 
+from recipes.models import Recipe
+from users.models import Subscribe, User
+
 
 @pytest.mark.django_db
 class TestSubscriptions:
 
     SUBSCRIBE_URL = "/subscribe/"
     SUBSCRIPTION_URL = "/api/users/subscriptions/"
+    AUTHORS_COUNT = 4
+    AUTHOR_RECIPES_COUNT = 3
 
     @pytest.fixture(autouse=True)
     def setup_authenticated_client(self, authenticated_client):
@@ -127,3 +135,136 @@ class TestSubscriptions:
         )
         assert response.status_code == 401
         assert "detail" in response.data
+
+    def test_09_subscribers_count(self, create_subscription, second_user_id):
+        """Проверяем счетчик подписчиков пользователя."""
+        user = User.objects.get(id=second_user_id)
+        assert user.subscribers_count == 1
+
+        self.authenticated_client.delete(
+            f"{USER_URL}{second_user_id}{self.SUBSCRIBE_URL}"
+        )
+        user.refresh_from_db()
+        assert user.subscribers_count == 0
+
+    @pytest.fixture
+    def create_authors(self):
+        """Создаем авторов с рецептами и подписываемся на них."""
+        user = User.objects.get(email=self.authenticated_data["email"])
+        authors = []
+        for number in range(self.AUTHORS_COUNT):
+            author = User.objects.create(
+                username=f"author_{number}", email=f"author_{number}@ya.ru"
+            )
+            for recipe_number in range(self.AUTHOR_RECIPES_COUNT):
+                Recipe.objects.create(
+                    author=author,
+                    name=f"recipe_{number}_{recipe_number}",
+                    text="text",
+                    cooking_time=1,
+                )
+            Subscribe.objects.create(user=user, subscription=author)
+            authors.append(author)
+        call_command("recount_counters", stdout=io.StringIO())
+        return authors
+
+    def test_10_subscriptions_recipes_limit(
+        self, create_authors, django_assert_num_queries
+    ):
+        """
+        Проверяем, что рецепты авторов ограничиваются в базе данных
+        и количество запросов не зависит от количества подписок.
+        """
+        # Токен, количество, подписки с авторами, рецепты.
+        with django_assert_num_queries(4):
+            response = self.authenticated_client.get(
+                self.SUBSCRIPTION_URL, {"recipes_limit": 2}
+            )
+        assert response.status_code == 200
+        assert response.data["count"] == self.AUTHORS_COUNT
+        for author in response.data["results"]:
+            assert author["is_subscribed"] is True
+            assert author["recipes_count"] == self.AUTHOR_RECIPES_COUNT
+            assert [recipe["name"] for recipe in author["recipes"]] == [
+                f"{author['username'].replace('author', 'recipe')}_{number}"
+                for number in (2, 1)
+            ]
+
+        response = self.authenticated_client.get(self.SUBSCRIPTION_URL)
+        assert all(
+            len(author["recipes"]) == self.AUTHOR_RECIPES_COUNT
+            for author in response.data["results"]
+        )
+
+    @pytest.mark.parametrize("recipes_limit", ("-1", "a"))
+    def test_11_invalid_recipes_limit(self, recipes_limit):
+        """Проверяем валидацию recipes_limit."""
+        response = self.authenticated_client.get(
+            self.SUBSCRIPTION_URL, {"recipes_limit": recipes_limit}
+        )
+        assert response.status_code == 400
+        assert "recipes_limit" in response.data
+
+    def test_12_subscriptions_cursor_pagination(
+        self, create_authors, django_assert_num_queries
+    ):
+        """
+        Проверяем курсорную пагинацию подписок по id подписки
+        с ограничением количества рецептов.
+        """
+        params = {"pagination": "cursor", "limit": 3, "recipes_limit": 1}
+        # Токен, подписки с авторами, рецепты.
+        with django_assert_num_queries(3):
+            response = self.authenticated_client.get(
+                self.SUBSCRIPTION_URL, params
+            )
+        assert response.status_code == 200
+        assert "count" not in response.data
+        assert response.data["previous"] is None
+        first_page = response.data["results"]
+        assert [author["username"] for author in first_page] == [
+            f"author_{number}" for number in range(3)
+        ]
+        assert all(len(author["recipes"]) == 1 for author in first_page)
+
+        response = self.authenticated_client.get(response.data["next"])
+        assert response.status_code == 200
+        assert response.data["next"] is None
+        assert [
+            author["username"] for author in response.data["results"]
+        ] == ["author_3"]
+        assert len(response.data["results"][0]["recipes"]) == 1
+
+    def test_13_subscribe_list_pagination(self, create_authors):
+        """Проверяем пагинацию списка подписок эндпоинта subscribe."""
+        url = f"{USER_URL}{create_authors[0].id}{self.SUBSCRIBE_URL}"
+        response = self.authenticated_client.get(
+            url, {"limit": 2, "recipes_limit": 1}
+        )
+        assert response.status_code == 200
+        assert response.data["count"] == self.AUTHORS_COUNT
+        assert len(response.data["results"]) == 2
+        assert all(
+            len(author["recipes"]) == 1
+            for author in response.data["results"]
+        )
+
+        response = self.authenticated_client.get(
+            url, {"pagination": "cursor", "limit": 2}
+        )
+        assert response.status_code == 200
+        assert [
+            author["username"] for author in response.data["results"]
+        ] == ["author_0", "author_1"]
+        assert response.data["next"] is not None
+
+    def test_14_subscribers_count_on_user_delete(
+        self, create_subscription, second_user_id
+    ):
+        """
+        Проверяем, что удаление подписчика уменьшает
+        счетчик подписчиков автора.
+        """
+        User.objects.get(email=self.authenticated_data["email"]).delete()
+        user = User.objects.get(id=second_user_id)
+        assert user.subscribers_count == 0
@@ -1,10 +1,22 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 from tests.constants import FAVORITE_URL, RECIPE_URL
 
+from recipes.models import Favorite, Recipe, User
+
 
 @pytest.mark.django_db
 class TestFavorite:
 
+    FAVORITE_BULK_URL = "/api/recipes/favorite/bulk/"
+    PARALLEL_REQUESTS = 8
+
     @pytest.fixture(autouse=True)
     def setup_authenticated_client(self, authenticated_client):
         """
@@ -93,3 +105,141 @@ class TestFavorite:
         )
         assert response.status_code == 401
         assert "detail" in response.data
+
+    def test_07_favorites_count(self, create_favorite, first_recipe_id):
+        """Проверяем счетчик добавлений рецепта в избранное."""
+        recipe = Recipe.objects.get(id=first_recipe_id)
+        assert recipe.favorites_count == 1
+
+        self.second_authenticated_client.delete(
+            f"{RECIPE_URL}{first_recipe_id}{FAVORITE_URL}"
+        )
+        recipe.refresh_from_db()
+        assert recipe.favorites_count == 0
+
+    def test_08_recount_counters(self, create_favorite, first_recipe_id):
+        """Проверяем пересчет счетчиков командой."""
+        Recipe.objects.update(favorites_count=0)
+        call_command("recount_counters")
+        recipe = Recipe.objects.get(id=first_recipe_id)
+        assert recipe.favorites_count == 1
+        assert recipe.author.recipes_count == 1
+
+    def test_09_bulk_favorite(
+        self, create_favorite, first_recipe_id, second_recipe_id
+    ):
+        """Проверяем массовое добавление и удаление избранного."""
+        missing_id = second_recipe_id + 1
+        ids = [first_recipe_id, second_recipe_id, missing_id]
+        response = self.second_authenticated_client.post(
+            self.FAVORITE_BULK_URL, {"ids": ids}, format="json"
+        )
+        assert response.status_code == 200
+        assert response.data["results"] == {
+            first_recipe_id: "exists",
+            second_recipe_id: "added",
+            missing_id: "not_found",
+        }
+        assert list(
+            Recipe.objects.order_by("id").values_list(
+                "favorites_count", flat=True
+            )
+        ) == [1, 1]
+
+        for results in (("removed", "removed"), ("missing", "missing")):
+            response = self.second_authenticated_client.delete(
+                self.FAVORITE_BULK_URL, {"ids": ids}, format="json"
+            )
+            assert response.status_code == 200
+            assert response.data["results"] == {
+                first_recipe_id: results[0],
+                second_recipe_id: results[1],
+                missing_id: "not_found",
+            }
+        assert not Favorite.objects.exists()
+        assert list(
+            Recipe.objects.values_list("favorites_count", flat=True)
+        ) == [0, 0]
+
+    def test_10_bulk_favorite_constant_queries(
+        self, create_recipes, first_recipe_id, second_recipe_id
+    ):
+        """
+        Проверяем, что количество запросов не зависит
+        от количества рецептов.
+        """
+        queries = []
+        for ids in ([first_recipe_id], [second_recipe_id, first_recipe_id]):
+            Favorite.objects.all().delete()
+            with CaptureQueriesContext(connection) as context:
+                self.second_authenticated_client.post(
+                    self.FAVORITE_BULK_URL, {"ids": ids}, format="json"
+                )
+            queries.append(len(context))
+        assert queries[0] == queries[1]
+
+    @pytest.mark.parametrize("ids", ([], ["id"], list(range(1, 102))))
+    def test_11_bulk_favorite_validation(self, ids):
+        """Проверяем валидацию списка id рецептов."""
+        response = self.second_authenticated_client.post(
+            self.FAVORITE_BULK_URL, {"ids": ids}, format="json"
+        )
+        assert response.status_code == 400
+        assert "ids" in response.data
+
+    @pytest.mark.django_db(transaction=True)
+    def test_12_parallel_favorite_toggle(
+        self, create_recipes, first_recipe_id
+    ):
+        """
+        Проверяем, что параллельные добавления и удаления рецепта
+        не приводят к ошибке сервера и не портят счетчик.
+        """
+        url = f"{RECIPE_URL}{first_recipe_id}{FAVORITE_URL}"
+        credentials = self.second_authenticated_client._credentials
+        barrier = threading.Barrier(self.PARALLEL_REQUESTS)
+
+        def send(method):
+            client = APIClient()
+            client.credentials(**credentials)
+            barrier.wait()
+            try:
+                return getattr(client, method)(url).status_code
+            finally:
+                connection.close()
+
+        for method, success in (("post", 201), ("delete", 204)):
+            with ThreadPoolExecutor(self.PARALLEL_REQUESTS) as executor:
+                statuses = list(
+                    executor.map(send, [method] * self.PARALLEL_REQUESTS)
+                )
+            assert sorted(statuses) == sorted(
+                [success] + [400] * (self.PARALLEL_REQUESTS - 1)
+            )
+            recipe = Recipe.objects.get(id=first_recipe_id)
+            assert recipe.favorites_count == Favorite.objects.count()
+
+    def test_13_favorites_count_on_user_delete(
+        self, create_favorite, first_recipe_id
+    ):
+        """
+        Проверяем, что удаление пользователя уменьшает счетчик
+        избранного рецепта, а удаление из избранного не опускает
+        рассинхронизированный счетчик ниже нуля.
+        """
+        Recipe.objects.filter(id=first_recipe_id).update(favorites_count=0)
+        response = self.second_authenticated_client.delete(
+            f"{RECIPE_URL}{first_recipe_id}{FAVORITE_URL}"
+        )
+        assert response.status_code == 204
+        recipe = Recipe.objects.get(id=first_recipe_id)
+        assert recipe.favorites_count == 0
+
+        self.second_authenticated_client.post(
+            f"{RECIPE_URL}{first_recipe_id}{FAVORITE_URL}"
+        )
+        User.objects.get(
+            email=self.second_authenticated_data["email"]
+        ).delete()
+        recipe.refresh_from_db()
+        assert recipe.favorites_count == 0
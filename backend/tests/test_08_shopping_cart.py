@@ -1,11 +1,35 @@
+import io
+import os
+import re
+import time
+
 import pytest
+from django.core.management import call_command
 from tests.constants import RECIPE_URL, SHOPPING_CART_URL
 
+from api import views
+from api.documents import get_document_path, open_document, store_document
+from api.jobs import lock_job
+from api.views import get_aggregatted_ingredients
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingListItem,
+    Tag,
+    User,
+)
+
 
 @pytest.mark.django_db
 class TestShoppingCart:
 
     DOWNLOAD_SHOPPING_CART = "/api/recipes/download_shopping_cart/"
+    SHOPPING_CART_SUMMARY = "/api/recipes/shopping_cart/summary/"
+    SHOPPING_CART_BULK = "/api/recipes/shopping_cart/bulk/"
+    LONG_LIST_LINES = 60
+    LONG_LIST_PAGES = 2
+    JOB_WAIT_SECONDS = 30
 
     @pytest.fixture(autouse=True)
     def setup_authenticated_client(self, authenticated_client):
@@ -123,3 +147,397 @@ class TestShoppingCart:
         )
         assert response.status_code == 401
         assert "detail" in response.data
+
+    @pytest.fixture()
+    def create_salt_shopping_cart(self):
+        """
+        Добавляем в список покупок два рецепта с солью
+        в граммах и в чайных ложках.
+        """
+        user = User.objects.get(
+            username=self.second_authenticated_data["username"]
+        )
+        salt_grams = Ingredient.objects.create(
+            name="соль", measurement_unit="г"
+        )
+        salt_spoons = Ingredient.objects.create(
+            name="соль", measurement_unit="ч. л."
+        )
+        for number, (grams, spoons) in enumerate(((10, 1), (5, 2))):
+            recipe = Recipe.objects.create(
+                author=user,
+                name=f"recipe_{number}",
+                text="text",
+                cooking_time=1,
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=salt_grams, amount=grams
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=salt_spoons, amount=spoons
+            )
+            self.second_authenticated_client.post(
+                f"{RECIPE_URL}{recipe.id}{SHOPPING_CART_URL}"
+            )
+        return user
+
+    def test_09_aggregate_ingredients_with_different_units(
+        self, create_salt_shopping_cart, django_assert_num_queries
+    ):
+        """
+        Проверяем, что ингредиенты с одинаковым названием
+        и разными единицами измерения суммируются отдельно.
+        """
+        with django_assert_num_queries(1):
+            ingredients = list(
+                get_aggregatted_ingredients(create_salt_shopping_cart)
+            )
+        assert ingredients == [
+            {"name": "соль", "measurement_unit": "г", "total_amount": 15},
+            {"name": "соль", "measurement_unit": "ч. л.", "total_amount": 3},
+        ]
+
+    def test_10_long_shopping_cart_list(self):
+        """Проверяем перенос длинного списка покупок на новую страницу."""
+        user = User.objects.get(
+            username=self.second_authenticated_data["username"]
+        )
+        recipe = Recipe.objects.create(
+            author=user, name="long_recipe", text="text", cooking_time=1
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"ingredient_{number}", measurement_unit="г")
+            for number in range(self.LONG_LIST_LINES)
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        )
+        self.second_authenticated_client.post(
+            f"{RECIPE_URL}{recipe.id}{SHOPPING_CART_URL}"
+        )
+
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        content = b"".join(response.streaming_content)
+        assert content.startswith(b"%PDF")
+        pages = re.findall(rb"/Type /Page\b", content)
+        assert len(pages) == self.LONG_LIST_PAGES
+
+    @pytest.mark.parametrize(
+        "export_format, content_type, expected",
+        [
+            (
+                "txt",
+                "text/plain; charset=utf-8",
+                "Список покупок\n\nсоль (г) — 15\nсоль (ч. л.) — 3\n",
+            ),
+            (
+                "csv",
+                "text/csv; charset=utf-8",
+                "name,measurement_unit,amount\r\n"
+                "соль,г,15\r\nсоль,ч. л.,3\r\n",
+            ),
+            (
+                "json",
+                "application/json; charset=utf-8",
+                '[{"name": "соль", "measurement_unit": "г", "amount": 15},'
+                '{"name": "соль", "measurement_unit": "ч. л.", "amount": 3}]',
+            ),
+        ],
+    )
+    def test_11_export_shopping_cart_formats(
+        self, create_salt_shopping_cart, export_format, content_type, expected
+    ):
+        """Проверяем потоковую выгрузку списка покупок в разных форматах."""
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART, {"format": export_format}
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == content_type
+        assert response["Content-Disposition"] == (
+            f'attachment; filename="shoppinglist.{export_format}"'
+        )
+        content = b"".join(response.streaming_content).decode()
+        assert content == expected
+
+    def test_12_export_empty_shopping_cart_json(self):
+        """Проверяем выгрузку пустого списка покупок в JSON."""
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART, {"format": "json"}
+        )
+        assert b"".join(response.streaming_content) == b"[]"
+
+    def test_13_unauthorized_export_returns_json_error(self, client):
+        """Проверяем, что ошибка выгрузки отдается в JSON."""
+        response = client.get(self.DOWNLOAD_SHOPPING_CART, {"format": "csv"})
+        assert response.status_code == 401
+        assert response["Content-Type"] == "application/json"
+        assert "detail" in response.json()
+
+    def test_14_shopping_cart_summary(
+        self, create_salt_shopping_cart, django_assert_num_queries
+    ):
+        """
+        Проверяем, что суммарный список покупок обновляется
+        при изменении корзины и ингредиентов рецепта.
+        """
+        first_recipe, second_recipe = Recipe.objects.filter(
+            name__startswith="recipe_"
+        ).order_by("name")
+        with django_assert_num_queries(2):
+            response = self.second_authenticated_client.get(
+                self.SHOPPING_CART_SUMMARY
+            )
+        assert response.status_code == 200
+        assert [
+            (item["name"], item["measurement_unit"], item["amount"])
+            for item in response.data
+        ] == [("соль", "г", 15), ("соль", "ч. л.", 3)]
+
+        self.second_authenticated_client.delete(
+            f"{RECIPE_URL}{first_recipe.id}{SHOPPING_CART_URL}"
+        )
+        response = self.second_authenticated_client.get(
+            self.SHOPPING_CART_SUMMARY
+        )
+        assert [item["amount"] for item in response.data] == [5, 2]
+
+        salt_grams = response.data[0]["id"]
+        response = self.second_authenticated_client.patch(
+            f"{RECIPE_URL}{second_recipe.id}/",
+            {
+                "ingredients": [{"id": salt_grams, "amount": 7}],
+                "tags": [Tag.objects.create(name="tag", slug="tag").id],
+            },
+            format="json",
+        )
+        assert response.status_code == 200, response.data
+        response = self.second_authenticated_client.get(
+            self.SHOPPING_CART_SUMMARY
+        )
+        assert [
+            (item["measurement_unit"], item["amount"])
+            for item in response.data
+        ] == [("г", 7)]
+
+        items = list(ShoppingListItem.objects.values_list("amount", flat=True))
+        call_command("recount_counters")
+        assert (
+            list(ShoppingListItem.objects.values_list("amount", flat=True))
+            == items
+        )
+
+        self.second_authenticated_client.delete(
+            f"{RECIPE_URL}{second_recipe.id}/"
+        )
+        assert not ShoppingListItem.objects.exists()
+
+    def test_15_unauthorized_user_cant_get_summary(self, client):
+        """Проверяем, что аноним не может получить список покупок."""
+        response = client.get(self.SHOPPING_CART_SUMMARY)
+        assert response.status_code == 401
+
+    def test_16_cached_shopping_list_document(
+        self, create_salt_shopping_cart, document_cache_dir, monkeypatch
+    ):
+        """Проверяем повторную выгрузку pdf-документа из кэша."""
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART
+        )
+        content = b"".join(response.streaming_content)
+        etag = response["ETag"]
+        assert len(list(document_cache_dir.iterdir())) == 1
+
+        def render_again(ingredients):
+            raise AssertionError("Документ построен повторно.")
+
+        monkeypatch.setattr(views, "get_shopping_list_pdf", render_again)
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART
+        )
+        assert response["ETag"] == etag
+        assert b"".join(response.streaming_content) == content
+
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+
+        recipe = Recipe.objects.get(name="recipe_0")
+        self.second_authenticated_client.delete(
+            f"{RECIPE_URL}{recipe.id}{SHOPPING_CART_URL}"
+        )
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART,
+            {"format": "txt"},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_17_evict_documents(self, settings, document_cache_dir):
+        """Проверяем вытеснение документов по возрасту и размеру."""
+        settings.DOCUMENT_CACHE_MAX_SIZE = 10
+        for key in ("old", "stale", "fresh"):
+            store_document(key, "txt", io.BytesIO(b"x" * 8)).close()
+            if key == "old":
+                past = time.time() - settings.DOCUMENT_CACHE_MAX_AGE - 1
+                os.utime(get_document_path(key, "txt"), (past, past))
+        assert [path.name for path in document_cache_dir.iterdir()] == [
+            "fresh.txt"
+        ]
+        assert open_document("old", "txt") is None
+
+    def test_18_shopping_list_render_job(
+        self, create_salt_shopping_cart, settings
+    ):
+        """
+        Проверяем построение pdf-документа фоновым заданием
+        и синхронную выгрузку небольшого списка.
+        """
+        response = self.second_authenticated_client.post(
+            self.DOWNLOAD_SHOPPING_CART
+        )
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/pdf"
+
+        settings.DOCUMENT_JOB_THRESHOLD = 2
+        response = self.second_authenticated_client.post(
+            self.DOWNLOAD_SHOPPING_CART
+        )
+        assert response.status_code == 202
+        assert response.data["status"] in ("pending", "ready")
+        job_url = f"{self.DOWNLOAD_SHOPPING_CART}{response.data['id']}/"
+        assert response["Location"].endswith(job_url)
+
+        deadline = time.monotonic() + self.JOB_WAIT_SECONDS
+        response = self.second_authenticated_client.get(job_url)
+        while response.status_code == 202 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            response = self.second_authenticated_client.get(job_url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/pdf"
+        assert b"".join(response.streaming_content).startswith(b"%PDF")
+
+        response = self.second_authenticated_client.post(
+            self.DOWNLOAD_SHOPPING_CART
+        )
+        assert response.status_code == 202
+        assert response.data["status"] == "ready"
+
+        response = self.second_authenticated_client.get(
+            f"{self.DOWNLOAD_SHOPPING_CART}{'0' * 64}/"
+        )
+        assert response.status_code == 404
+
+    def test_19_bulk_shopping_cart(self, create_salt_shopping_cart):
+        """
+        Проверяем, что массовое изменение списка покупок
+        обновляет счетчики и суммарный список покупок.
+        """
+        ids = list(
+            Recipe.objects.filter(name__startswith="recipe_")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        response = self.second_authenticated_client.delete(
+            self.SHOPPING_CART_BULK, {"ids": ids}, format="json"
+        )
+        assert response.status_code == 200
+        assert set(response.data["results"].values()) == {"removed"}
+        assert not ShoppingListItem.objects.exists()
+        assert set(
+            Recipe.objects.values_list("shopping_carts_count", flat=True)
+        ) == {0}
+
+        response = self.second_authenticated_client.post(
+            self.SHOPPING_CART_BULK, {"ids": ids + ids[:1]}, format="json"
+        )
+        assert response.status_code == 200
+        assert response.data["results"] == dict.fromkeys(ids, "added")
+        response = self.second_authenticated_client.get(
+            self.SHOPPING_CART_SUMMARY
+        )
+        assert [item["amount"] for item in response.data] == [15, 3]
+        assert set(
+            Recipe.objects.filter(id__in=ids).values_list(
+                "shopping_carts_count", flat=True
+            )
+        ) == {1}
+
+        items = ShoppingListItem.objects.order_by("ingredient").values_list(
+            "ingredient", "amount"
+        )
+        expected = list(items)
+        call_command("recount_counters")
+        assert list(items) == expected
+
+    def test_20_export_etag_from_database(
+        self, create_salt_shopping_cart, django_assert_num_queries
+    ):
+        """
+        Проверяем, что ETag текстовой выгрузки считается базой данных
+        без чтения списка покупок.
+        """
+        params = {"format": "csv"}
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART, params
+        )
+        etag = response["ETag"]
+        b"".join(response.streaming_content)
+        # Токен, хэш списка покупок.
+        with django_assert_num_queries(2):
+            response = self.second_authenticated_client.get(
+                self.DOWNLOAD_SHOPPING_CART, params, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+
+        ShoppingListItem.objects.update(amount=1)
+        response = self.second_authenticated_client.get(
+            self.DOWNLOAD_SHOPPING_CART, params, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert b"".join(response.streaming_content).decode().endswith(
+            "соль,ч. л.,1\r\n"
+        )
+
+    def test_21_shopping_list_after_author_delete(
+        self, create_salt_shopping_cart
+    ):
+        """
+        Проверяем, что удаление автора вычитает его рецепты
+        из списков покупок других пользователей.
+        """
+        recipe = Recipe.objects.get(name="recipe_0")
+        self.authenticated_client.post(
+            f"{RECIPE_URL}{recipe.id}{SHOPPING_CART_URL}"
+        )
+        create_salt_shopping_cart.delete()
+        response = self.authenticated_client.get(self.SHOPPING_CART_SUMMARY)
+        assert response.status_code == 200
+        assert response.data == []
+        assert not ShoppingListItem.objects.exists()
+
+    def test_22_interrupted_render_job(self):
+        """
+        Проверяем, что задание без блокировки процесса,
+        например после перезапуска backend, считается завершившимся
+        ошибкой.
+        """
+        key = "a" * 64
+        job_url = f"{self.DOWNLOAD_SHOPPING_CART}{key}/"
+        lock = lock_job(key)
+        response = self.second_authenticated_client.get(job_url)
+        assert response.status_code == 202
+        assert response.data["status"] == "pending"
+
+        lock.close()
+        response = self.second_authenticated_client.get(job_url)
+        assert response.status_code == 200
+        assert response.data["status"] == "failed"
@@ -4,3 +4,5 @@ EMAIL_MAX_LENGTH = 254
 USERNAME_MAX_LENGTH = 150
 # Максимальная длина поля name
 NAME_MAX_LENGTH = 150
+# Параметр количества рецептов автора в списке подписок
+RECIPES_LIMIT_PARAM = "recipes_limit"
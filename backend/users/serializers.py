@@ -13,6 +13,7 @@ from recipes.serializers import RecipeReadShortSerializer
 from users.constants import (
     EMAIL_MAX_LENGTH,
     NAME_MAX_LENGTH,
+    RECIPES_LIMIT_PARAM,
     USERNAME_MAX_LENGTH,
 )
 from users.mixins import ValidateEmailMixin, ValidateUsernameMixin
@@ -55,10 +56,18 @@ class CustomUserSerializer(ValidateUsernameMixin, serializers.ModelSerializer):
         model = User
 
     def get_is_subscribed(self, obj):
-        """Проверяем, подписан ли пользователь."""
+        """
+        Проверяем, подписан ли пользователь.
 
-        user = self.context["request"].user
-        if user.is_authenticated:
+        Используем аннотацию из queryset, если она есть.
+        """
+
+        request = self.context.get("request")
+        user = request.user if request else None
+        if user and user.is_authenticated:
+            subscribed = getattr(obj, "subscribed", None)
+            if subscribed is not None:
+                return subscribed
             return Subscribe.objects.filter(
                 user=user, subscription=obj
             ).exists()
@@ -182,15 +191,40 @@ class RegisterDataSerializer(
         return representation
 
 
+def get_recipes_limit(request):
+    """
+    Получаем ограничение количества рецептов автора в подписках.
+
+    Если параметр не передан, возвращаем None.
+    """
+    recipes_limit = request.query_params.get(RECIPES_LIMIT_PARAM)
+    if recipes_limit is None:
+        return None
+    try:
+        recipes_limit = int(recipes_limit)
+    except ValueError:
+        raise serializers.ValidationError(
+            {RECIPES_LIMIT_PARAM: "recipes_limit должно быть числом."}
+        )
+    if recipes_limit < 0:
+        raise serializers.ValidationError(
+            {RECIPES_LIMIT_PARAM: "recipes_limit должно быть больше нуля."}
+        )
+    return recipes_limit
+
+
 class SubscribeSerializer(serializers.ModelSerializer):
-    """Сериализатор для записи модели подписок."""
+    """
+    Сериализатор для записи модели подписок.
 
-    recipes = RecipeReadShortSerializer(
-        many=True, source="subscription.recipes", read_only=True
-    )
+    Рецепты автора берем из preview_recipes, если они
+    загружены вместе со списком подписок.
+    """
+
+    recipes = serializers.SerializerMethodField()
     subscription = CustomUserSerializer(read_only=True)
     recipes_count = serializers.IntegerField(
-        source="subscription.recipes.count", read_only=True
+        source="subscription.recipes_count", read_only=True
     )
 
     class Meta:
@@ -215,37 +249,24 @@ class SubscribeSerializer(serializers.ModelSerializer):
         return data
 
     def get_recipes(self, obj):
-        """
-        Получаем ограниченное количество рецептов подписанных пользователей.
-        """
-        recipe_limit = self.context.get("recipe_limit")
-        recipes_queryset = obj.subscription.recipes.all()
-        if recipe_limit:
-            recipes_queryset = recipes_queryset[: int(recipe_limit)]
-
-        return RecipeReadShortSerializer(recipes_queryset, many=True).data
+        """Получаем ограниченное количество рецептов автора."""
+        recipes = getattr(obj.subscription, "preview_recipes", None)
+        if recipes is None:
+            recipes = obj.subscription.recipes.order_by("-pub_date", "-id")
+            recipes_limit = get_recipes_limit(self.context["request"])
+            if recipes_limit is not None:
+                recipes = recipes[:recipes_limit]
+        return RecipeReadShortSerializer(
+            recipes, many=True, context=self.context
+        ).data
 
     def to_representation(self, instance):
-        """Возвращаем в ответе словарь объектов с учетом лимита рецептов."""
+        """Возвращаем в ответе автора с его рецептами."""
+        # Текущий пользователь подписан на автора, не проверяем это запросом.
+        instance.subscription.subscribed = True
         data = super().to_representation(instance)
-        request = self.context.get("request")
-        recipes_limit = request.query_params.get("recipes_limit")
-
-        if recipes_limit:
-            try:
-                recipes_limit = int(recipes_limit)
-                if recipes_limit < 0:
-                    raise ValidationError(
-                        "recipes_limit должно быть больше нуля."
-                    )
-            except ValueError:
-                raise ValidationError("recipes_limit должно быть числом.")
-
-            data["recipes"] = data["recipes"][:recipes_limit]
-
         return {
             **data["subscription"],
-            "is_subscribed": True,
             "recipes": data["recipes"],
             "recipes_count": data["recipes_count"],
         }
@@ -1,13 +1,24 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from rest_framework import status, views, viewsets
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
-from rest_framework.mixins import CreateModelMixin, DestroyModelMixin
+from rest_framework.mixins import (
+    CreateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+)
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from recipes.models import Recipe
+from recipes.paginations import (
+    CursorPaginationMixin,
+    SubscriptionCursorPagination,
+)
 from users.models import Subscribe, User
 from users.permissions import PostOrReadOnly
 from users.serializers import (
@@ -17,6 +28,7 @@ from users.serializers import (
     CustomUserSerializer,
     RegisterDataSerializer,
     SubscribeSerializer,
+    get_recipes_limit,
 )
 
 
@@ -144,42 +156,69 @@ class CustomLogoutView(views.APIView):
             )
 
 
-class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
+def get_subscriptions(request):
+    """
+    Получаем подписки пользователя с авторами и их рецептами.
+
+    Не больше recipes_limit последних рецептов каждого автора
+    загружаем одним запросом: срез в Prefetch база данных выполняет
+    через ROW_NUMBER() OVER (PARTITION BY author_id). Количество
+    запросов не зависит от количества подписок.
+    """
+    recipes = Recipe.objects.order_by("-pub_date", "-id")
+    recipes_limit = get_recipes_limit(request)
+    if recipes_limit is not None:
+        recipes = recipes[:recipes_limit]
+    return (
+        Subscribe.objects.filter(user=request.user)
+        .select_related("subscription")
+        .prefetch_related(
+            Prefetch(
+                "subscription__recipes",
+                queryset=recipes,
+                to_attr="preview_recipes",
+            )
+        )
+        .order_by("id")
+    )
+
+
+class SubscriptionViewSet(
+    CursorPaginationMixin, viewsets.ReadOnlyModelViewSet
+):
     """Вьюсет для спика подписок."""
 
+    cursor_pagination_class = SubscriptionCursorPagination
     serializer_class = SubscribeSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return Subscribe.objects.filter(user=self.request.user)
+        return get_subscriptions(self.request)
 
 
 class SubscribeViewSet(
-    CreateModelMixin, DestroyModelMixin, viewsets.GenericViewSet
+    CursorPaginationMixin,
+    CreateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+    viewsets.GenericViewSet,
 ):
     """Вьюсет для создания и удаления подписок."""
 
+    cursor_pagination_class = SubscriptionCursorPagination
     queryset = Subscribe.objects.all()
     serializer_class = SubscribeSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
         """Получаем список подписок пользователя."""
-        return Subscribe.objects.filter(user=self.request.user)
-
-    def list(self, request, *args, **kwargs):
-        """Получаем подписки с возможностью лимита на количество рецептов."""
-        queryset = self.get_queryset()
-        recipe_limit = self.request.query_params.get("recipe_limit")
-        serializer = self.get_serializer(
-            queryset, many=True, context={"recipe_limit": recipe_limit}
-        )
-        return Response(serializer.data)
+        return get_subscriptions(self.request)
 
     def perform_create(self, serializer):
         """Сохраняем автора и объект подписки."""
         subscription = get_object_or_404(User, id=self.kwargs["user_id"])
-        serializer.save(user=self.request.user, subscription=subscription)
+        with transaction.atomic():
+            serializer.save(user=self.request.user, subscription=subscription)
 
     def delete(self, request, *args, **kwargs):
         """Удаляем пользователя из подписок."""
@@ -192,5 +231,6 @@ class SubscribeViewSet(
                 {"errors": "Вы не подписаны на этого пользователя."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        subscribe.delete()
+        with transaction.atomic():
+            subscribe.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)